@@ -4,15 +4,1573 @@ import os
 import math
 import glob
 import re
+import json
+import mmap
+import struct
+import hashlib
+import multiprocessing
+import concurrent.futures
+import time
+import queue
+import sqlite3
+import threading
+import traceback
+import csv
+import gc
+import logging
+import logging.handlers
+import argparse
+import shutil
+import subprocess
+import tempfile
+from array import array
+from collections import OrderedDict, deque, defaultdict, Counter
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout,
     QLabel, QLineEdit, QPushButton, QDialog, QGraphicsDropShadowEffect,
-    QCalendarWidget, QTextEdit, QMessageBox, QHBoxLayout, QScrollArea,
-    QFrame, QGridLayout, QDockWidget, QListWidget, QListWidgetItem
+    QCalendarWidget, QTextEdit, QMessageBox, QHBoxLayout,
+    QFrame, QGridLayout, QDockWidget, QListWidget, QListWidgetItem,
+    QListView, QStyledItemDelegate, QStyle, QGraphicsEffect, QGraphicsScene,
+    QGraphicsPixmapItem, QStackedWidget
 )
-from PySide6.QtGui import QFont, QColor, QPalette, QPainter, QIcon, QPixmap, QPen, QBrush, QPainterPath
-from PySide6.QtCore import Qt, QTimer, QDynamicPropertyChangeEvent, QUrl, Signal
-from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+from PySide6.QtGui import QFont, QColor, QPalette, QPainter, QIcon, QPixmap, QPen, QBrush, QPainterPath, QTextCursor, QImage, QFontMetrics, QImageReader, QShortcut, QKeySequence, QRegion, QFontDatabase
+from PySide6.QtCore import (
+    Qt, QTimer, QDynamicPropertyChangeEvent, QUrl, Signal, QAbstractListModel, QModelIndex,
+    QSize, QRectF, QPoint, QPointF, QRect, QObject, QRunnable, QThreadPool, QEvent, QBuffer, QByteArray
+)
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput, QAudioFormat
+import shiboken6
+
+# Optional extras for the visualizer; the app runs without them
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from PySide6.QtMultimedia import QAudioBufferOutput
+except ImportError:
+    QAudioBufferOutput = None
+
+# Logging
+# Each area of the app logs to its own "lovebox.*" logger. setup_logging() puts a
+# QueueHandler in front of them, so a log call on the GUI thread just builds the record
+# and queues it; a QueueListener thread does the file and console writes. Messages use
+# lazy %-arguments and chatty per-item messages are DEBUG, so below LOVEBOX_LOG_LEVEL
+# they cost one level check.
+log = logging.getLogger("lovebox")
+media_log = logging.getLogger("lovebox.media")
+playlist_log = logging.getLogger("lovebox.playlist")
+image_log = logging.getLogger("lovebox.images")
+store_log = logging.getLogger("lovebox.store")
+diagnostics_log = logging.getLogger("lovebox.diagnostics")
+
+# RateLimitFilter Class
+class RateLimitFilter(logging.Filter):
+    """Let through `burst` records per message template every `interval` seconds.
+
+    The first record after a quiet spell says how many similar ones were dropped.
+    """
+
+    def __init__(self, burst=5, interval=10.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        key = (record.name, record.levelno, record.msg)
+        now = record.created
+        with self.lock:
+            started, count, suppressed = self.windows.get(key, (now, 0, 0))
+            if now - started >= self.interval:
+                started, count = now, 0
+            count += 1
+            if count > self.burst:
+                self.windows[key] = (started, count, suppressed + 1)
+                return False
+            self.windows[key] = (started, count, 0)
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+        return True
+
+log_listener = None
+
+def setup_logging(path, level=None):
+    """Send lovebox.* records through a queue to a rotating file and stderr."""
+    global log_listener
+    level = level or os.environ.get("LOVEBOX_LOG_LEVEL", "INFO")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=1 << 20, backupCount=3, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s"))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+    log.setLevel(level)
+    log.addHandler(queue_handler)
+    log.propagate = False
+    log_listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler)
+    log_listener.start()
+    return log_listener
+
+def stop_logging():
+    if log_listener is not None:
+        log_listener.stop()
+
+# Fonts
+# Font files in fonts/ next to the script are registered once at startup, and UI_FONT is
+# substituted by the first bundled family when the system doesn't have it, so kiosks
+# without Georgia skip fontconfig fallback. ui_font() hands out copies of one QFont per
+# (family, size, weight, style); Qt shares the resolved data between the copies.
+UI_FONT = "Georgia"
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+FONT_WARM_TEXT = "".join(chr(code) for code in range(32, 127))
+
+# FontRegistry Class
+class FontRegistry:
+    def __init__(self):
+        self.fonts = {}
+        self.bundled = []
+
+    def load_directory(self, directory):
+        """Register the font files in directory with Qt; returns the families they added."""
+        if not os.path.isdir(directory):
+            return []
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(FONT_EXTENSIONS):
+                continue
+            font_id = QFontDatabase.addApplicationFont(os.path.join(directory, name))
+            if font_id < 0:
+                log.warning("Could not load font %s", name)
+                continue
+            for family in QFontDatabase.applicationFontFamilies(font_id):
+                if family not in self.bundled:
+                    self.bundled.append(family)
+        if self.bundled and UI_FONT not in QFontDatabase.families():
+            QFont.insertSubstitution(UI_FONT, self.bundled[0])
+            log.info("%s is not installed, using bundled %s", UI_FONT, self.bundled[0])
+        return self.bundled
+
+    def font(self, family, size=-1, bold=False, italic=False):
+        key = (family, size, bold, italic)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = QFont(family, size, QFont.Weight.Bold if bold else QFont.Weight.Normal, italic)
+        # A copy, so callers can adjust theirs without changing everyone else's
+        return QFont(font)
+
+    def warm(self, widgets=(), text=FONT_WARM_TEXT):
+        """Shape and rasterize text in the fonts widgets resolved to, filling Qt's glyph caches.
+
+        Call it after the widgets are polished: the theme's font-size rules replace the point
+        sizes asked for with pixel sizes. The registry's own fonts are warmed too, for code that
+        paints with them directly.
+        """
+        started = time.perf_counter()
+        unique = {}
+        for font in [widget.font() for widget in widgets] + list(self.fonts.values()):
+            unique.setdefault(font.key(), font)
+        image = QImage(256, 64, QImage.Format_ARGB32_Premultiplied)
+        image.fill(Qt.transparent)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        for font in unique.values():
+            painter.setFont(font)
+            painter.drawText(0, 48, text)
+        painter.end()
+        log.debug("Warmed %d fonts in %.1f ms", len(unique), (time.perf_counter() - started) * 1000)
+
+fonts = FontRegistry()
+
+def ui_font(size=-1, bold=False, italic=False):
+    return fonts.font(UI_FONT, size, bold, italic)
+
+# Emoji
+# Emoji painted by widgets (maze hearts, cake sparkles, ...) are rasterized once per
+# (emoji, device pixel size) into one shared atlas and blitted from there, instead of
+# shaping a colour glyph through font fallback on every paint. Without a colour emoji font
+# the hearts and sparkles are drawn as shapes and the rest as plain text.
+EMOJI_FONTS = ("Noto Color Emoji", "Apple Color Emoji", "Segoe UI Emoji", "Twemoji Mozilla", "JoyPixels")
+APP_EMOJI = (("❤️", 24), ("💖", 24), ("✨", 16), ("🎵", 24))
+EMOJI_TEXT_FALLBACK = {"🎵": "♪"}
+
+def paint_heart(painter, rect, color):
+    x, y, w, h = rect.x(), rect.y(), rect.width(), rect.height()
+    path = QPainterPath()
+    path.moveTo(x + w / 2, y + h * 0.9)
+    path.cubicTo(x - w * 0.1, y + h * 0.45, x + w * 0.2, y, x + w / 2, y + h * 0.3)
+    path.cubicTo(x + w * 0.8, y, x + w * 1.1, y + h * 0.45, x + w / 2, y + h * 0.9)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(color)
+    painter.drawPath(path)
+
+def paint_sparkle(painter, rect, color):
+    center = rect.center()
+    path = QPainterPath()
+    for i in range(8):
+        # Alternate long points and a pinched waist for a four-pointed star
+        radius = rect.width() / 2 if i % 2 == 0 else rect.width() / 8
+        angle = math.pi / 4 * i
+        point = QPointF(center.x() + radius * math.sin(angle), center.y() - radius * math.cos(angle))
+        if i:
+            path.lineTo(point)
+        else:
+            path.moveTo(point)
+    path.closeSubpath()
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(color)
+    painter.drawPath(path)
+
+EMOJI_SHAPES = {
+    "❤️": lambda painter, rect: paint_heart(painter, rect, QColor("#E53935")),
+    "💖": lambda painter, rect: paint_heart(painter, rect, QColor("#FF69B4")),
+    "✨": lambda painter, rect: paint_sparkle(painter, rect, QColor("#FFD700")),
+}
+
+# EmojiAtlas Class
+class EmojiAtlas:
+    padding = 2
+
+    def __init__(self, width=512):
+        self.image = QImage(width, 64, QImage.Format_ARGB32_Premultiplied)
+        self.image.fill(Qt.transparent)
+        self.texture = None
+        self.cells = {}
+        self.pixmaps = {}
+        self.shelf_x = self.shelf_y = self.shelf_height = 0
+        self.family = False
+
+    def emoji_family(self):
+        # Looked up on first use, after any bundled fonts have been registered
+        if self.family is False:
+            available = set(QFontDatabase.families())
+            self.family = next((family for family in EMOJI_FONTS if family in available), None)
+            if self.family is None:
+                log.info("No colour emoji font found, drawing emoji as shapes")
+        return self.family
+
+    def allocate(self, pixels):
+        # Simple shelf packing; the atlas grows downwards, so existing cells never move
+        size = pixels + 2 * self.padding
+        if self.shelf_x + size > self.image.width():
+            self.shelf_x = 0
+            self.shelf_y += self.shelf_height
+            self.shelf_height = 0
+        if self.shelf_y + size > self.image.height():
+            grown = QImage(self.image.width(), max(2 * self.image.height(), self.shelf_y + size), QImage.Format_ARGB32_Premultiplied)
+            grown.fill(Qt.transparent)
+            painter = QPainter(grown)
+            painter.drawImage(0, 0, self.image)
+            painter.end()
+            self.image = grown
+        rect = QRect(self.shelf_x + self.padding, self.shelf_y + self.padding, pixels, pixels)
+        self.shelf_x += size
+        self.shelf_height = max(self.shelf_height, size)
+        return rect
+
+    def cell(self, emoji, pixels):
+        """The atlas rectangle holding emoji rasterized at pixels x pixels."""
+        key = (emoji, pixels)
+        rect = self.cells.get(key)
+        if rect is None:
+            rect = self.cells[key] = self.allocate(pixels)
+            painter = QPainter(self.image)
+            painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing)
+            painter.setClipRect(rect)
+            self.rasterize(painter, QRectF(rect), emoji)
+            painter.end()
+            self.texture = None
+        return rect
+
+    def rasterize(self, painter, rect, emoji):
+        family = self.emoji_family()
+        shape = EMOJI_SHAPES.get(emoji)
+        if family is None and shape is not None:
+            shape(painter, rect)
+            return
+        font = fonts.font(family) if family is not None else ui_font()
+        font.setPixelSize(max(1, round(rect.height() * 0.8)))
+        painter.setFont(font)
+        painter.setPen(QColor(THEME_COLORS["accent"]))
+        painter.drawText(rect, Qt.AlignCenter, emoji if family is not None else EMOJI_TEXT_FALLBACK.get(emoji, emoji))
+
+    def draw(self, painter, rect, emoji, size=None):
+        """Paint emoji centred in rect, size logical pixels across (default: fit rect)."""
+        rect = QRectF(rect)
+        size = size or min(rect.width(), rect.height())
+        source = self.cell(emoji, max(1, round(size * painter.device().devicePixelRatioF())))
+        if self.texture is None:
+            self.texture = QPixmap.fromImage(self.image)
+        target = QRectF(0, 0, size, size)
+        target.moveCenter(rect.center())
+        painter.drawPixmap(target, self.texture, QRectF(source))
+
+    def pixmap(self, emoji, size, ratio=1.0):
+        """A standalone pixmap of emoji for labels and icons, cut from the atlas once."""
+        key = (emoji, size, ratio)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            pixmap = self.pixmaps[key] = QPixmap.fromImage(self.image.copy(self.cell(emoji, max(1, round(size * ratio)))))
+            pixmap.setDevicePixelRatio(ratio)
+        return pixmap
+
+    def warm(self, ratio=1.0):
+        for emoji, size in APP_EMOJI:
+            self.cell(emoji, max(1, round(size * ratio)))
+
+emoji_atlas = EmojiAtlas()
+
+def draw_emoji(painter, rect, emoji, size=None):
+    emoji_atlas.draw(painter, rect, emoji, size)
+
+# Theme
+THEME_COLORS = {
+    "background": "#0d0d0d",
+    "accent": "#4fc3f7",
+    "border": "#4682b4",
+}
+
+# Compiled once and installed on the QApplication; widgets opt in through the
+# "role" dynamic property (plus optional "textSize", "bold" and "padded") or object names.
+THEME_TEMPLATE = """
+QWidget[role="page"] { background-color: transparent; }
+QWidget[role="dark"], QDialog[role="dark"] { background-color: @background; }
+QWidget[role="panel"], QFrame[role="panel"] { background-color: @background; border: 2px solid @border; border-radius: 10px; }
+
+QLabel[role="text"] { color: @accent; background-color: transparent; }
+QLabel[role="boxedTitle"] { color: @accent; border: 2px solid @border; border-radius: 10px; padding: 10px; }
+QLabel[role="note"] { color: @accent; border: 1px solid @border; border-radius: 5px; padding: 5px; }
+QLabel[role="thumbnail"] { border: 2px solid @border; border-radius: 10px; }
+QLabel[role="poemText"] { color: @accent; background-color: transparent; padding: 10px; }
+QLabel[role="terminal"] { color: @accent; font-family: Consolas; }
+
+QLabel[cell="wall"] { background-color: @background; border: none; }
+QLabel[cell="path"] { background-color: @background; border: 1px solid @border; }
+QLabel[cell="heart"] { background-color: @background; color: @accent; border: 1px solid @border; }
+
+QPushButton[role="accent"] { background-color: @border; color: @background; }
+QPushButton[padded="true"] { padding: 10px; }
+QPushButton[role="outline"] { background-color: @background; color: @accent; border: 2px solid @border; border-radius: 10px; padding: 10px; }
+QPushButton[role="outline"]:hover { background-color: @border; color: @background; }
+QPushButton[role="pill"] { background-color: @background; color: @accent; border: 2px solid @border; border-radius: 20px; padding: 20px; }
+QPushButton[role="pill"]:hover { background-color: #000000; color: @border; }
+
+QLineEdit[role="field"], QTextEdit[role="field"] { background-color: @background; color: @accent; border: 1px solid @border; }
+QFrame[role="poem"] {
+    background-color: @background;
+    border-left: 4px solid @border;
+    border-top: 1px solid @border;
+    border-right: 1px solid @border;
+    border-bottom: 1px solid @border;
+    border-radius: 10px;
+    padding: 15px;
+}
+QScrollArea[role="grid"], QListView[role="grid"] { background-color: transparent; border: none; }
+QListWidget[role="songs"] { background-color: @background; color: @accent; border: 2px solid @border; }
+QListWidget[role="songs"]::item:selected { background-color: @border; color: @background; }
+
+*[textSize="12"] { font-size: 12px; }
+*[textSize="14"] { font-size: 14px; }
+*[textSize="16"] { font-size: 16px; }
+*[textSize="18"] { font-size: 18px; }
+*[textSize="20"] { font-size: 20px; }
+*[textSize="22"] { font-size: 22px; }
+*[textSize="24"] { font-size: 24px; }
+*[bold="true"] { font-weight: bold; }
+
+#friendsTab, #friendsTab QWidget { background-color: rgba(13, 13, 13, 0.6); color: @accent; }
+#friendsTab QPushButton[role="letter"] {
+    background-color: @border;
+    color: @background;
+    font-size: 14px;
+    font-weight: bold;
+    padding: 12px;
+    border-radius: 10px;
+    margin: 8px;
+    border: 2px solid @accent;
+    min-width: 200px;
+    text-align: left;
+}
+#friendsTab QPushButton[role="letter"]:hover { background-color: @accent; color: @background; border: 2px solid #ffffff; }
+
+#playlistSidebar { background-color: @background; border-left: 2px solid @border; }
+
+#memoriesCalendar QWidget { background-color: @background; color: @accent; }
+#memoriesCalendar QAbstractItemView:enabled { color: @accent; selection-background-color: @border; selection-color: @background; }
+#memoriesCalendar QToolButton { background-color: @background; color: @accent; }
+#memoriesCalendar QMenu { background-color: @background; color: @accent; }
+
+DetailPanel { background-color: rgba(0, 0, 0, 160); }
+#detailCard { background-color: @background; border: 2px solid @border; border-radius: 10px; }
+
+#mainTabs::pane { border: 2px solid @border; border-radius: 10px; background-color: @background; }
+#mainTabs QTabBar::tab {
+    background: @background;
+    color: @accent;
+    padding: 10px;
+    margin-right: 2px;
+    border-top-left-radius: 5px;
+    border-top-right-radius: 5px;
+    font-size: 14px;
+}
+#mainTabs QTabBar::tab:selected { background: @border; color: @background; }
+"""
+
+def build_stylesheet(colors=THEME_COLORS):
+    sheet = THEME_TEMPLATE
+    for name, value in colors.items():
+        sheet = sheet.replace(f"@{name}", value)
+    return sheet
+
+def apply_theme(app, colors=THEME_COLORS):
+    app.setStyleSheet(build_stylesheet(colors))
+
+def set_role(widget, role, size=None, bold=False, padded=False):
+    widget.setProperty("role", role)
+    if role in ("panel", "dark"):
+        # Plain QWidgets only paint stylesheet backgrounds and borders with this set
+        widget.setAttribute(Qt.WA_StyledBackground)
+    if size:
+        widget.setProperty("textSize", size)
+    if bold:
+        widget.setProperty("bold", True)
+    if padded:
+        widget.setProperty("padded", True)
+
+def refresh_style(widget):
+    """Re-run the stylesheet match after a dynamic property changed."""
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+# Glow
+# "full" keeps a live QGraphicsDropShadowEffect per widget, "cached" blits a glow
+# pre-rendered once per text/size/color, "off" skips glows for low-end kiosks.
+GLOW_QUALITIES = ("full", "cached", "off")
+glow_quality = os.environ.get("LOVEBOX_GLOW", "cached")
+if glow_quality not in GLOW_QUALITIES:
+    glow_quality = "cached"
+
+glow_cache = OrderedDict()
+glow_cache_limit = 128
+
+def shared_glow(key, render):
+    """Return the glow cached under key, calling render() to build it on a miss."""
+    entry = glow_cache.get(key)
+    if entry is None:
+        entry = render()
+        glow_cache[key] = entry
+        if len(glow_cache) > glow_cache_limit:
+            glow_cache.popitem(last=False)
+    else:
+        glow_cache.move_to_end(key)
+    return entry
+
+# CachedGlowEffect Class
+class CachedGlowEffect(QGraphicsEffect):
+    def __init__(self, widget, blur_radius, color):
+        super().__init__(widget)
+        self.widget = widget
+        self.blur_radius = blur_radius
+        self.color = QColor(color)
+
+    def boundingRectFor(self, rect):
+        r = self.blur_radius
+        return rect.adjusted(-r, -r, r, r)
+
+    def cache_key(self):
+        widget = self.widget
+        text = widget.text() if hasattr(widget, "text") else ""
+        # Labels showing a pixmap (the maze hearts) or icon buttons differ only in the image
+        pixmap = widget.pixmap() if hasattr(widget, "pixmap") else None
+        image_key = pixmap.cacheKey() if pixmap is not None and not pixmap.isNull() else 0
+        icon_key = widget.icon().cacheKey() if hasattr(widget, "icon") else 0
+        size = widget.size()
+        # :hover and :disabled stylesheet rules change what the widget paints
+        return (text, image_key, icon_key, size.width(), size.height(), widget.devicePixelRatioF(),
+                widget.underMouse(), widget.isEnabled(), widget.font().key(), self.color.rgba(), self.blur_radius)
+
+    def render(self):
+        offset = QPoint()
+        source = self.sourcePixmap(Qt.LogicalCoordinates, offset, QGraphicsEffect.PadToEffectiveBoundingRect)
+        return render_glow(source, self.blur_radius, self.color), offset
+
+    def draw(self, painter):
+        glow_pixmap, offset = shared_glow(self.cache_key(), self.render)
+        painter.drawPixmap(offset, glow_pixmap)
+        self.drawSource(painter)
+
+def render_glow(source, blur_radius, color):
+    """Render the same shadow QGraphicsDropShadowEffect would, without the source on top."""
+    ratio = source.devicePixelRatio()
+    width = source.width() / ratio
+    height = source.height() / ratio
+
+    # Push the shadow clear of the item, render both side by side, keep the shadow half
+    gap = 2 * blur_radius
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(source)
+    shadow = QGraphicsDropShadowEffect()
+    shadow.setBlurRadius(blur_radius)
+    shadow.setColor(QColor(color))
+    shadow.setOffset(width + gap, 0)
+    item.setGraphicsEffect(shadow)
+    scene.addItem(item)
+
+    strip = QImage(round((2 * width + gap) * ratio), source.height(), QImage.Format_ARGB32_Premultiplied)
+    strip.fill(Qt.transparent)
+    painter = QPainter(strip)
+    scene.render(painter, QRectF(strip.rect()), QRectF(0, 0, 2 * width + gap, height))
+    painter.end()
+    result = strip.copy(round((width + gap) * ratio), 0, source.width(), source.height())
+    result.setDevicePixelRatio(ratio)
+    return QPixmap.fromImage(result)
+
+def apply_glow(widget, blur_radius, color):
+    widget.setProperty("glowRadius", blur_radius)
+    widget.setProperty("glowColor", QColor(color))
+    install_glow(widget)
+
+def clear_glow(widget):
+    widget.setProperty("glowRadius", None)
+    widget.setGraphicsEffect(None)
+
+def install_glow(widget):
+    blur_radius = widget.property("glowRadius")
+    color = widget.property("glowColor")
+    # Effects are parented to their widget, otherwise Python may collect them
+    if glow_quality == "full":
+        effect = QGraphicsDropShadowEffect(widget)
+        effect.setBlurRadius(blur_radius)
+        effect.setColor(color)
+        effect.setOffset(0, 0)
+    elif glow_quality == "cached":
+        effect = CachedGlowEffect(widget, blur_radius, color)
+    else:
+        effect = None
+    widget.setGraphicsEffect(effect)
+
+def set_glow_quality(quality):
+    """Switch every glowing widget to a new quality level at runtime."""
+    global glow_quality
+    if quality not in GLOW_QUALITIES:
+        raise ValueError(f"Unknown glow quality: {quality}")
+    glow_quality = quality
+    for widget in QApplication.allWidgets():
+        if widget.property("glowRadius"):
+            install_glow(widget)
+
+# History
+# Plays, skips, tab views and dialog opens are appended to SQLite in batches from a
+# background thread. Per-subject counts are also kept in memory so rollup queries
+# like most_played() never wait on the disk.
+# HistoryStore Class
+class HistoryStore:
+    batch_size = 200
+    flush_interval = 2.0
+
+    def __init__(self, path):
+        self.path = path
+        self.events = queue.Queue()
+        self.counts = defaultdict(Counter)
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="HistoryStore", daemon=True)
+        self.thread.start()
+
+    def record(self, kind, subject, detail=""):
+        with self.lock:
+            self.counts[kind][subject] += 1
+        self.events.put((time.time(), kind, subject, detail))
+
+    def count(self, kind, subject):
+        with self.lock:
+            return self.counts[kind][subject]
+
+    def top(self, kind, limit=10):
+        with self.lock:
+            return self.counts[kind].most_common(limit)
+
+    def most_played(self, limit=10):
+        """Track paths ordered by play count, e.g. for deciding what to preload."""
+        return self.top("play", limit)
+
+    def open_database(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS events (at REAL, kind TEXT, subject TEXT, detail TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS rollups (kind TEXT, subject TEXT, count INTEGER, last_at REAL, PRIMARY KEY (kind, subject))")
+        # Counts are additive, so events recorded while this loads are not lost
+        with self.lock:
+            for kind, subject, count in db.execute("SELECT kind, subject, count FROM rollups"):
+                self.counts[kind][subject] += count
+        return db
+
+    def write_batch(self, db, rows):
+        with db:
+            db.executemany("INSERT INTO events VALUES (?, ?, ?, ?)", rows)
+            db.executemany(
+                "INSERT INTO rollups VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(kind, subject) DO UPDATE SET count = count + 1, last_at = excluded.last_at",
+                [(kind, subject, at) for at, kind, subject, _ in rows],
+            )
+
+    def run(self):
+        try:
+            db = self.open_database()
+        except Exception as e:
+            store_log.error("Could not open history store %s: %s", self.path, e)
+            db = None
+
+        while True:
+            # Block for the first event, then gather more until the batch is full or stale
+            batch = [self.events.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.events.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            rows = [event for event in batch if event is not None]
+            if db is not None and rows:
+                try:
+                    self.write_batch(db, rows)
+                except sqlite3.Error as e:
+                    store_log.error("Could not write history: %s", e)
+            if batch[-1] is None:
+                break
+
+        if db is not None:
+            db.close()
+
+    def close(self):
+        """Flush pending events and stop the writer thread."""
+        self.events.put(None)
+        self.thread.join(timeout=5)
+
+history = None
+
+def open_history(path):
+    global history
+    history = HistoryStore(path)
+    return history
+
+def record_event(kind, subject, detail=""):
+    if history is not None:
+        history.record(kind, subject, detail)
+
+# Library Index
+# Per-track facts that are expensive to work out (waveform overviews, ...) are kept in
+# .lovebox_cache/library_index.json, keyed by path and dropped when the file changes.
+WAV_FORMATS = {(1, 8): "u1", (1, 16): "<i2", (1, 32): "<i4", (3, 32): "<f4"}
+
+def open_wav_pcm(path):
+    """Memory-map the PCM data of a WAV file.
+
+    Returns (samples, sample_rate, offset, scale) where samples is a frames x channels
+    numpy.memmap and (samples - offset) * scale is in -1..1.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:4] != b"RIFF" or mm[8:12] != b"WAVE":
+            raise ValueError("not a WAV file")
+        position = 12
+        fmt = None
+        while position + 8 <= len(mm):
+            chunk_id = mm[position:position + 4]
+            size = struct.unpack_from("<I", mm, position + 4)[0]
+            body = position + 8
+            if chunk_id == b"fmt ":
+                tag, channels, rate = struct.unpack_from("<HHI", mm, body)
+                bits = struct.unpack_from("<H", mm, body + 14)[0]
+                if tag == 0xFFFE:
+                    tag = struct.unpack_from("<H", mm, body + 24)[0]
+                fmt = (tag, channels, rate, bits)
+            elif chunk_id == b"data" and fmt is not None:
+                break
+            position = body + size + (size & 1)
+        else:
+            raise ValueError("no audio data")
+        length = len(mm)
+
+    tag, channels, rate, bits = fmt
+    dtype = WAV_FORMATS.get((tag, bits))
+    if dtype is None:
+        raise ValueError(f"unsupported WAV sample format {tag}/{bits}-bit")
+    dtype = np.dtype(dtype)
+    frames = min(size, length - body) // (dtype.itemsize * channels)
+    if frames == 0:
+        return np.zeros((0, channels), dtype=dtype), rate, 0.0, 1.0
+    # numpy.memmap keeps its own mapping alive for as long as any view of it exists
+    samples = np.memmap(path, dtype=dtype, mode="r", offset=body, shape=(frames, channels))
+    if dtype.kind == "f":
+        return samples, rate, 0.0, 1.0
+    return samples, rate, 128.0 if dtype.kind == "u" else 0.0, 1.0 / (1 << (bits - 1))
+
+def compute_peaks(path, buckets):
+    """Min/max of every bucket of a WAV file, scaled to -1..1, as a 2 x buckets array."""
+    peaks = np.zeros((2, buckets), dtype=np.float32)
+    samples, rate, offset, scale = open_wav_pcm(path)
+    per_bucket = len(samples) // buckets
+    if per_bucket == 0:
+        return peaks
+    blocks = samples[:per_bucket * buckets].reshape(buckets, -1)
+    # A few buckets at a time so min and max read the same pages while they are hot
+    for start in range(0, buckets, 64):
+        chunk = blocks[start:start + 64]
+        peaks[0, start:start + len(chunk)] = chunk.min(axis=1)
+        peaks[1, start:start + len(chunk)] = chunk.max(axis=1)
+    peaks -= offset
+    peaks *= scale
+    return peaks
+
+# LibraryIndex Class
+class LibraryIndex:
+    # A library scan updates one track at a time; writes are batched into one save per window
+    save_delay_ms = 2000
+
+    def __init__(self, path):
+        self.path = path
+        self.directory = os.path.dirname(path)
+        self.lock = threading.Lock()
+        self.tracks = {}
+        self.dirty = False
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.tracks = json.load(f).get("tracks", {})
+        except (OSError, ValueError) as e:
+            store_log.info("Starting a new library index: %s", e)
+
+    def signature(self, track_path):
+        stat = os.stat(track_path)
+        return [stat.st_size, int(stat.st_mtime)]
+
+    def entry(self, track_path):
+        """The stored facts for a track, or an empty dict if it is unknown or has changed."""
+        try:
+            signature = self.signature(track_path)
+        except OSError:
+            return {}
+        with self.lock:
+            entry = self.tracks.get(track_path)
+            if entry is None or entry.get("signature") != signature:
+                return {}
+            return dict(entry)
+
+    def update(self, track_path, **values):
+        try:
+            signature = self.signature(track_path)
+        except OSError as e:
+            store_log.warning("Could not update library index: %s", e)
+            return
+        with self.lock:
+            entry = self.tracks.get(track_path)
+            if entry is None or entry.get("signature") != signature:
+                entry = self.tracks[track_path] = {"signature": signature}
+            entry.update(values)
+            schedule = not self.dirty
+            self.dirty = True
+        if schedule:
+            QTimer.singleShot(self.save_delay_ms, self.flush)
+
+    def cache_path(self, track_path, kind, extension):
+        name = hashlib.sha1(track_path.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, kind, name + extension)
+
+    def flush(self):
+        """Write the index if anything changed since the last save."""
+        if self.dirty:
+            self.save()
+
+    def save(self):
+        with self.lock:
+            data = json.dumps({"version": 1, "tracks": self.tracks}, separators=(",", ":"))
+            self.dirty = False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Per-process temp name so two running copies never write into the same file
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            store_log.error("Could not save library index: %s", e)
+
+library = None
+
+def open_library(path):
+    global library
+    library = LibraryIndex(path)
+    return library
+
+# Assets
+# Photos and icons can be compiled into one memory-mapped pack (python V8.py --pack-assets)
+# holding each file's bytes plus thumbnails decoded ahead of time. Names are paths relative
+# to the script directory with forward slashes, e.g. "P/j1.jpg"; anything the pack doesn't
+# have is read from the filesystem, so the app still runs without one. Entries whose source
+# file changed size or mtime since packing are read from the filesystem too.
+ASSET_PACK_NAME = "assets.pack"
+ASSET_PACK_MAGIC = b"LBAP"
+ASSET_PACK_VERSION = 2
+ASSET_PACK_HEADER = struct.Struct("<4sII")
+ASSET_PATTERNS = ("P/*.jpg", "P/*.jpeg", "P/*.png", "*.png", "*.jpg")
+THUMBNAIL_SIZES = (QSize(150, 150), QSize(250, 250))
+
+def thumbnail_key(size):
+    return f"{size.width()}x{size.height()}"
+
+def read_image(data, size=None):
+    """Decode image bytes, letting the decoder downscale to fit size when given."""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(bytes(data)))
+    reader = QImageReader(buffer)
+    reader.setAutoTransform(True)
+    if size is not None and reader.size().isValid():
+        reader.setScaledSize(reader.size().scaled(size, Qt.KeepAspectRatio))
+    return reader.read()
+
+def build_asset_pack(root, path, sizes=THUMBNAIL_SIZES):
+    """Pack every asset under root into path; returns the number of assets written."""
+    names = sorted({os.path.relpath(found, root).replace(os.sep, "/")
+                    for pattern in ASSET_PATTERNS for found in glob.glob(os.path.join(root, pattern))})
+    blobs = []
+    toc = {}
+    offset = 0
+
+    def add(data):
+        nonlocal offset
+        # 16-byte alignment keeps every blob, and so every thumbnail row, aligned in the map
+        start = offset
+        padding = -len(data) % 16
+        blobs.append(data)
+        blobs.append(b"\0" * padding)
+        offset += len(data) + padding
+        return start
+
+    for name in names:
+        with open(os.path.join(root, name), "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        entry = toc[name] = {"offset": add(data), "size": len(data), "mtime_ns": stat.st_mtime_ns, "thumbnails": {}}
+        for size in sizes:
+            image = read_image(data, size)
+            if image.isNull():
+                store_log.warning("Packing %s without thumbnails: not a readable image", name)
+                break
+            image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+            entry["thumbnails"][thumbnail_key(size)] = {
+                "offset": add(bytes(image.constBits())),
+                "width": image.width(),
+                "height": image.height(),
+                "stride": image.bytesPerLine(),
+            }
+
+    toc_data = json.dumps(toc).encode("utf-8")
+    toc_data += b" " * (-(ASSET_PACK_HEADER.size + len(toc_data)) % 16)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(ASSET_PACK_HEADER.pack(ASSET_PACK_MAGIC, ASSET_PACK_VERSION, len(toc_data)))
+        f.write(toc_data)
+        f.writelines(blobs)
+    os.replace(temp_path, path)
+    return len(names)
+
+# Assets Class
+class Assets:
+    def __init__(self, root, pack_path=None):
+        self.root = root
+        self.toc = {}
+        self.view = None
+        if pack_path is not None and os.path.exists(pack_path):
+            try:
+                self.open_pack(pack_path)
+            except (OSError, ValueError) as e:
+                store_log.warning("Ignoring asset pack %s: %s", pack_path, e)
+
+    def open_pack(self, path):
+        with open(path, "rb") as f:
+            # The mapping outlives the file object and stays open for the life of the process
+            pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(pack) < ASSET_PACK_HEADER.size:
+            raise ValueError("truncated asset pack")
+        magic, version, toc_size = ASSET_PACK_HEADER.unpack_from(pack)
+        if magic != ASSET_PACK_MAGIC or version != ASSET_PACK_VERSION:
+            raise ValueError("not a version %d asset pack" % ASSET_PACK_VERSION)
+        self.data_start = ASSET_PACK_HEADER.size + toc_size
+        self.toc = json.loads(pack[ASSET_PACK_HEADER.size:self.data_start])
+        self.view = memoryview(pack)
+        stale = [name for name, entry in self.toc.items() if self.is_stale(name, entry)]
+        for name in stale:
+            del self.toc[name]
+        if stale:
+            store_log.warning("Asset pack %s is out of date for %d assets, loading them from disk; rebuild with --pack-assets", path, len(stale))
+        store_log.info("Asset pack %s: %d assets", path, len(self.toc))
+
+    def is_stale(self, name, entry):
+        """Whether the source file changed since it was packed; a missing source keeps the packed copy."""
+        try:
+            stat = os.stat(self.path(name))
+        except OSError:
+            return False
+        return stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]
+
+    def path(self, name):
+        return os.path.join(self.root, *name.split("/"))
+
+    def exists(self, name):
+        return name in self.toc or os.path.exists(self.path(name))
+
+    def data(self, name):
+        """The asset's bytes, as a zero-copy view into the pack when it has them; None if missing."""
+        entry = self.toc.get(name)
+        if entry is not None:
+            start = self.data_start + entry["offset"]
+            return self.view[start:start + entry["size"]]
+        try:
+            with open(self.path(name), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def image(self, name, size=None):
+        """Decode an asset, downscaled to fit size when given; a null QImage if it is missing."""
+        data = self.data(name)
+        return QImage() if data is None else read_image(data, size)
+
+    def thumbnail(self, name, size):
+        """An image fitting size, pre-decoded in the pack when it has one at that size."""
+        entry = self.toc.get(name, {}).get("thumbnails", {}).get(thumbnail_key(size))
+        if entry is None:
+            return self.image(name, size)
+        start = self.data_start + entry["offset"]
+        pixels = self.view[start:start + entry["stride"] * entry["height"]]
+        # Copy out of the read-only map: Qt would write into a wrapped buffer on detach
+        return QImage(pixels, entry["width"], entry["height"], entry["stride"], QImage.Format_ARGB32_Premultiplied).copy()
+
+    def pixmap(self, name):
+        return QPixmap.fromImage(self.image(name))
+
+    def icon(self, name):
+        return QIcon(self.pixmap(name)) if self.exists(name) else QIcon()
+
+assets = Assets(os.path.dirname(os.path.abspath(__file__)))
+
+def open_assets(path):
+    global assets
+    assets = Assets(assets.root, path)
+    return assets
+
+# Loudness
+# Tracks are measured once in a process pool (ITU-R BS.1770 / EBU R128 integrated loudness)
+# and each one is played with the gain that brings it to PLAYBACK_LOUDNESS.
+PLAYBACK_VOLUME = 0.5
+PLAYBACK_LOUDNESS = -18.0
+GAIN_LIMITS = (-12.0, 6.0)
+
+def k_weighting(size, rate):
+    """Squared magnitude of the BS.1770 K-weighting filter at the rfft bins of a block of `size` samples."""
+    # Pre-filter (high shelf) then RLB high-pass, with the standard analog-matched coefficients
+    k = math.tan(math.pi * 1681.974450955533 / rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    shelf_b = [vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k]
+    shelf_a = [1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k]
+    k = math.tan(math.pi * 38.13547087602444 / rate)
+    q = 0.5003270373238773
+    highpass_b = [1.0, -2.0, 1.0]
+    highpass_a = [1.0, 2 * (k * k - 1) / (1 + k / q + k * k), (1 - k / q + k * k) / (1 + k / q + k * k)]
+
+    z = np.exp(-2j * np.pi * np.fft.rfftfreq(size, 1 / rate) / rate)
+    response = np.ones_like(z)
+    for b, a in ((shelf_b, shelf_a), (highpass_b, highpass_a)):
+        response *= (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+    return np.abs(response) ** 2
+
+def measure_loudness(path):
+    """Integrated loudness of a WAV file in LUFS, or None if it is silent.
+
+    K-weighting is applied per 100 ms hop in the frequency domain, which makes it possible
+    to measure the whole file with batched FFTs; the gating follows BS.1770.
+    """
+    samples, rate, offset, scale = open_wav_pcm(path)
+    hop = rate // 10
+    hops = len(samples) // hop
+    if hops < 4:
+        return None
+    # Parseval: mean square of a hop from its one-sided spectrum
+    weights = k_weighting(hop, rate) * 2 / hop ** 2
+    weights[0] /= 2
+    if hop % 2 == 0:
+        weights[-1] /= 2
+    powers = np.zeros(hops)
+    for start in range(0, hops, 64):
+        chunk = np.asarray(samples[start * hop:min(start + 64, hops) * hop], dtype=np.float32)
+        chunk -= offset
+        chunk *= scale
+        spectra = np.fft.rfft(chunk.reshape(-1, hop, chunk.shape[1]), axis=1)
+        powers[start:start + len(spectra)] = np.einsum("nbc,b->n", spectra.real ** 2 + spectra.imag ** 2, weights)
+
+    # 400 ms gating blocks with 75% overlap
+    blocks = (powers[:-3] + powers[1:-2] + powers[2:-1] + powers[3:]) / 4
+    block_loudness = -0.691 + 10 * np.log10(np.maximum(blocks, 1e-12))
+    gated = blocks[block_loudness > -70]
+    if not len(gated):
+        return None
+    relative_gate = -0.691 + 10 * math.log10(gated.mean()) - 10
+    gated = blocks[(block_loudness > -70) & (block_loudness > relative_gate)]
+    return float(-0.691 + 10 * math.log10(gated.mean()))
+
+def track_gain(loudness):
+    if loudness is None:
+        return 0.0
+    return min(max(PLAYBACK_LOUDNESS - loudness, GAIN_LIMITS[0]), GAIN_LIMITS[1])
+
+def apply_track_gain(audio_output, path):
+    """Set the output volume for a track from its measured gain, or the plain volume if unmeasured."""
+    gain = library.entry(path).get("gain", 0.0) if library is not None else 0.0
+    audio_output.setVolume(min(1.0, PLAYBACK_VOLUME * 10 ** (gain / 20)))
+
+# LoudnessScanner Class
+class LoudnessScanner(QObject):
+    """Measure every track not yet in the library index, in parallel, one result saved at a time.
+
+    Results are written to the index as they arrive, so a scan cut short by quitting just
+    carries on with the remaining tracks next time.
+    """
+    measured = Signal(str, object)
+    finished = Signal()
+    start_delay = 2000
+    max_workers = 2
+
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.executor = None
+        self.remaining = 0
+        self.measured.connect(self.store)
+
+    def start(self):
+        if library is None or np is None:
+            return
+        todo = [path for path in self.paths if "loudness" not in library.entry(path)]
+        if not todo:
+            return
+        # Forking a running Qt app is not safe, so workers are spawned. Each one re-imports
+        # this file as __mp_main__, PySide6 and the module-level setup included, so only a
+        # couple are started however many cores there are
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=max(1, min(len(todo), self.max_workers, (os.cpu_count() or 2) - 1)),
+            mp_context=multiprocessing.get_context("spawn"))
+        self.remaining = len(todo)
+        for path in todo:
+            future = self.executor.submit(measure_loudness, path)
+            future.add_done_callback(lambda future, path=path: self.report(path, future))
+
+    def report(self, path, future):
+        # Runs on the executor's thread; the signal is queued to the GUI thread
+        if future.cancelled():
+            return
+        try:
+            loudness = future.result()
+        except Exception as e:
+            media_log.warning("Could not measure loudness of %s: %s", path, e)
+            loudness = None
+        self.measured.emit(path, loudness)
+
+    def store(self, path, loudness):
+        library.update(path, loudness=loudness, gain=track_gain(loudness))
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.stop()
+            self.finished.emit()
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+# Diagnostics
+# A watchdog thread notices when the event loop stops turning and samples the main
+# thread's Python stack while it is stuck. LOVEBOX_STALL_MS sets the threshold.
+STALL_THRESHOLD_MS = int(os.environ.get("LOVEBOX_STALL_MS", "50"))
+
+# StallWatchdog Class
+class StallWatchdog(QObject):
+    beat_interval = 20
+    sample_interval = 0.01
+    histogram_bounds = (50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.threshold_ms = threshold_ms
+        self.main_thread_id = threading.main_thread().ident
+        self.lock = threading.Lock()
+        self.last_beat = time.perf_counter()
+        self.lags = deque(maxlen=1000)
+        self.histogram = Counter()
+        self.stall_count = 0
+        self.sites = {}
+        # Stacks sampled during the stall in progress, handed over when the loop wakes up
+        self.samples = Counter()
+        self.stacks = {}
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.beat)
+        self.timer.start(self.beat_interval)
+
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="StallWatchdog", daemon=True)
+        self.thread.start()
+
+    def beat(self):
+        now = time.perf_counter()
+        lag = (now - self.last_beat) * 1000 - self.beat_interval
+        self.last_beat = now
+        self.lags.append(max(lag, 0.0))
+        if lag >= self.threshold_ms:
+            self.record_stall(lag)
+        else:
+            # Too short to count as a stall, so whatever the sampler caught must not be blamed on the next one
+            with self.lock:
+                self.samples.clear()
+                self.stacks.clear()
+
+    def run(self):
+        while not self.stopping.wait(self.sample_interval):
+            # Same cut-off as beat(): a stall is a beat arriving threshold_ms late
+            if (time.perf_counter() - self.last_beat) * 1000 < self.threshold_ms + self.beat_interval:
+                continue
+            frame = sys._current_frames().get(self.main_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame, limit=12)
+            del frame
+            # Blame the innermost line of LoveBox itself rather than library internals
+            own_frames = [entry for entry in stack if entry.filename == __file__]
+            innermost = own_frames[-1] if own_frames else stack[-1]
+            site = f"{os.path.basename(innermost.filename)}:{innermost.lineno} in {innermost.name}"
+            with self.lock:
+                self.samples[site] += 1
+                if site not in self.stacks:
+                    self.stacks[site] = "".join(traceback.format_list(stack))
+
+    def histogram_bucket(self, lag):
+        for bound in self.histogram_bounds:
+            if lag < bound:
+                return f"<{bound}ms"
+        return f">={self.histogram_bounds[-1]}ms"
+
+    def record_stall(self, lag):
+        with self.lock:
+            samples, self.samples = self.samples, Counter()
+            stacks, self.stacks = self.stacks, {}
+        self.stall_count += 1
+        self.histogram[self.histogram_bucket(lag)] += 1
+        if not samples:
+            # Over before the sampler looked, so there is nothing to blame
+            samples = Counter({"(not sampled)": 1})
+        total = sum(samples.values())
+        for site, count in samples.items():
+            entry = self.sites.setdefault(site, {"site": site, "stalls": 0, "samples": 0, "stall_ms": 0.0, "stack": stacks.get(site, "")})
+            entry["stalls"] += 1
+            entry["samples"] += count
+            entry["stall_ms"] += lag * count / total
+
+    def top_sites(self, limit=10):
+        """Stall sites ranked by the stall time attributed to them."""
+        return sorted((dict(entry) for entry in self.sites.values()), key=lambda entry: entry["stall_ms"], reverse=True)[:limit]
+
+    def stats(self):
+        """Counters and the stall-duration histogram, for dashboards."""
+        lags = sorted(self.lags)
+        labels = [f"<{bound}ms" for bound in self.histogram_bounds] + [f">={self.histogram_bounds[-1]}ms"]
+        return {
+            "stalls": self.stall_count,
+            "histogram": {label: self.histogram[label] for label in labels},
+            "lag_p50_ms": lags[len(lags) // 2] if lags else 0.0,
+            "lag_p99_ms": lags[int(len(lags) * 0.99)] if lags else 0.0,
+            "lag_max_ms": lags[-1] if lags else 0.0,
+        }
+
+    def report(self, limit=5):
+        lines = [f"{self.stall_count} event loop stalls over {self.threshold_ms} ms"]
+        for entry in self.top_sites(limit):
+            lines.append(f"  {entry['stall_ms']:8.0f} ms in {entry['stalls']} stalls at {entry['site']}")
+            lines.extend("      " + line for line in entry["stack"].rstrip().splitlines()[-4:])
+        return "\n".join(lines)
+
+    def stop(self):
+        self.stopping.set()
+        self.timer.stop()
+
+watchdog = None
+
+def start_watchdog(threshold_ms=STALL_THRESHOLD_MS):
+    global watchdog
+    watchdog = StallWatchdog(threshold_ms)
+    return watchdog
+
+# Frame profiling
+# Opt-in with LOVEBOX_PROFILE=1. Registered widgets have their paint events and the
+# timeouts of their own timers timed from an event filter; F12 toggles the frame-time
+# HUD and Ctrl+F12 writes the samples to a CSV file in .lovebox_cache.
+# FrameRing Class
+class FrameRing:
+    """Fixed-size ring of floats; adding overwrites the oldest sample and allocates nothing."""
+
+    def __init__(self, size):
+        self.values = array("d", bytes(8 * size))
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def add(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def add_to_last(self, value):
+        self.values[(self.index - 1) % self.size] += value
+
+    def ordered(self):
+        start = (self.index - self.count) % self.size
+        return [self.values[(start + i) % self.size] for i in range(self.count)]
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+# FrameTrack Class
+class FrameTrack:
+    """Recent paint and timer samples of one registered widget (or group of widgets)."""
+
+    def __init__(self, name, size):
+        self.name = name
+        self.paint_at = FrameRing(size)
+        self.paint_ms = FrameRing(size)
+        self.timer_at = FrameRing(size)
+        self.timer_ms = FrameRing(size)
+        self.target_interval = 1000 / 60
+        self.dropped = 0
+        self.last_paint = None
+        self.frame_end = None
+        self.ticked = False
+
+    def add_paint(self, started, elapsed):
+        if self.frame_end is not None and started - self.frame_end < 0.002:
+            # Widgets of one group repainted in the same pass make up a single frame
+            self.paint_ms.add_to_last(elapsed)
+            self.frame_end = started + elapsed / 1000
+            return
+        # Only animations driven by a timer can drop frames; a quiet maze is just idle
+        if self.ticked and self.last_paint is not None and (started - self.last_paint) * 1000 > 1.5 * self.target_interval:
+            self.dropped += 1
+        self.ticked = False
+        self.last_paint = started
+        self.frame_end = started + elapsed / 1000
+        self.paint_at.add(started)
+        self.paint_ms.add(elapsed)
+
+    def add_timer(self, started, elapsed, interval):
+        if interval > 0:
+            self.target_interval = interval
+        self.ticked = True
+        self.timer_at.add(started)
+        self.timer_ms.add(elapsed)
+
+    def summary(self):
+        paint_at = self.paint_at.ordered()
+        paint_ms = self.paint_ms.ordered()
+        timer_ms = sorted(self.timer_ms.ordered())
+        span = paint_at[-1] - paint_at[0] if len(paint_at) > 1 else 0.0
+        return {
+            "name": self.name,
+            "fps": (len(paint_at) - 1) / span if span else 0.0,
+            "paint_total_ms": sum(paint_ms),
+            "paint_p50_ms": percentile(sorted(paint_ms), 0.5),
+            "paint_p99_ms": percentile(sorted(paint_ms), 0.99),
+            "timer_p50_ms": percentile(timer_ms, 0.5),
+            "timer_p99_ms": percentile(timer_ms, 0.99),
+            "dropped": self.dropped,
+        }
+
+# FrameProfiler Class
+class FrameProfiler(QObject):
+    ring_size = 240
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tracks = {}
+        self.started = time.perf_counter()
+        self.pending_attach = {}
+
+    def register(self, widget, name):
+        """Time the widget's paint events and its timers' timeouts under `name`."""
+        if name not in self.tracks:
+            self.tracks[name] = FrameTrack(name, self.ring_size)
+        widget.setProperty("frameProfile", name)
+        widget.installEventFilter(self)
+        self.attach_timers(widget)
+
+    def attach_timers(self, widget):
+        for timer in widget.findChildren(QTimer, options=Qt.FindDirectChildrenOnly):
+            if timer.property("frameProfile") is None:
+                timer.setProperty("frameProfile", widget.property("frameProfile"))
+                timer.installEventFilter(self)
+
+    def attach_pending(self):
+        pending, self.pending_attach = self.pending_attach, {}
+        for widget in pending.values():
+            # Widgets deleted since their child was added are skipped
+            if shiboken6.isValid(widget):
+                self.attach_timers(widget)
+
+    def eventFilter(self, watched, event):
+        kind = event.type()
+        if kind == QEvent.Paint or kind == QEvent.Timer:
+            track = self.tracks.get(watched.property("frameProfile"))
+            if track is None:
+                return False
+            # Deliver the event here so its handler can be timed, then stop it going further
+            started = time.perf_counter()
+            watched.event(event)
+            elapsed = (time.perf_counter() - started) * 1000
+            if kind == QEvent.Paint:
+                track.add_paint(started, elapsed)
+            else:
+                track.add_timer(started, elapsed, watched.interval())
+            return True
+        if kind == QEvent.ChildAdded:
+            # The child is still being constructed, so look for new timers once it is done,
+            # in one pass per widget however many children (glow effects, ...) arrive first
+            if not self.pending_attach:
+                QTimer.singleShot(0, self.attach_pending)
+            self.pending_attach[id(watched)] = watched
+        return False
+
+    def top_painters(self, limit=5):
+        return sorted((track.summary() for track in self.tracks.values()), key=lambda summary: summary["paint_total_ms"], reverse=True)[:limit]
+
+    def export_csv(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "kind", "started_s", "duration_ms"])
+            for track in self.tracks.values():
+                for kind, started, durations in (("paint", track.paint_at, track.paint_ms), ("timer", track.timer_at, track.timer_ms)):
+                    for at, duration in zip(started.ordered(), durations.ordered()):
+                        writer.writerow([track.name, kind, f"{at - self.started:.6f}", f"{duration:.4f}"])
+        diagnostics_log.info("Frame samples written to %s", path)
+
+# FrameHud Class
+class FrameHud(QWidget):
+    """Overlay listing FPS, p50/p99 paint time and dropped frames of the top painters."""
+
+    def __init__(self, profiler, parent):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.font = fonts.font("Monospace", 9)
+        self.font.setStyleHint(QFont.TypeWriter)
+        self.background = QColor(0, 0, 0, 180)
+        self.text_color = QColor("#7CFC00")
+        self.lines = []
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.timer.start(500)
+
+    def refresh(self):
+        self.lines = [f"{'widget':<10} {'fps':>5} {'p50':>6} {'p99':>6} {'drop':>5}"]
+        for summary in self.profiler.top_painters():
+            self.lines.append(f"{summary['name']:<10} {summary['fps']:5.1f} {summary['paint_p50_ms']:6.2f} {summary['paint_p99_ms']:6.2f} {summary['dropped']:5d}")
+        metrics = QFontMetrics(self.font)
+        self.resize(max(metrics.horizontalAdvance(line) for line in self.lines) + 16, metrics.height() * len(self.lines) + 12)
+        self.move(8, 8)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.background)
+        painter.setFont(self.font)
+        painter.setPen(self.text_color)
+        metrics = painter.fontMetrics()
+        for i, line in enumerate(self.lines):
+            painter.drawText(8, 6 + metrics.ascent() + i * metrics.height(), line)
+
+profiler = None
+
+def start_profiler():
+    global profiler
+    profiler = FrameProfiler()
+    return profiler
+
+def profile_widget(widget, name):
+    if profiler is not None:
+        profiler.register(widget, name)
+
+def take_census():
+    """Live QObjects by class and the pixmaps they hold, for diffing before and after a flow.
+
+    Objects are counted from every Qt object tree reachable from the application, plus
+    any wrapped QObject Python still holds; pixmaps sharing data are counted once.
+    """
+    app = QApplication.instance()
+    objects = {}
+    roots = [app] + app.topLevelWidgets() + [obj for obj in gc.get_objects() if isinstance(obj, QObject)]
+    for root in roots:
+        try:
+            for obj in [root] + root.findChildren(QObject):
+                objects[obj] = obj.metaObject().className()
+        except RuntimeError:
+            # Python wrapper whose C++ object is already gone
+            continue
+
+    pixmaps = {}
+    for obj in gc.get_objects():
+        if isinstance(obj, QPixmap) and not obj.isNull():
+            pixmaps[obj.cacheKey()] = obj
+    for obj in objects:
+        if isinstance(obj, QLabel):
+            pixmap = obj.pixmap()
+            if not pixmap.isNull():
+                pixmaps[pixmap.cacheKey()] = pixmap
+    return {
+        "objects": Counter(objects.values()),
+        "pixmaps": len(pixmaps),
+        "pixmap_bytes": sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8 for pixmap in pixmaps.values()),
+    }
+
+def diff_census(before, after):
+    """What changed between two censuses; only classes whose count moved are listed."""
+    classes = set(before["objects"]) | set(after["objects"])
+    objects = {name: after["objects"][name] - before["objects"][name] for name in classes}
+    return {
+        "objects": {name: delta for name, delta in sorted(objects.items(), key=lambda item: -abs(item[1])) if delta},
+        "object_total": sum(objects.values()),
+        "pixmaps": after["pixmaps"] - before["pixmaps"],
+        "pixmap_bytes": after["pixmap_bytes"] - before["pixmap_bytes"],
+    }
+
+def format_census_diff(diff, limit=10):
+    lines = [f"{diff['object_total']:+d} QObjects, {diff['pixmaps']:+d} pixmaps ({diff['pixmap_bytes'] / 1024:+.0f} KiB)"]
+    for name, delta in list(diff["objects"].items())[:limit]:
+        lines.append(f"  {delta:+6d} {name}")
+    return "\n".join(lines)
+
+# Clock
+# Animated widgets get their timers from the module clock instead of making QTimers,
+# so tests can swap in a SimulatedClock and run a whole animation without waiting.
+# QtClock Class
+class QtClock:
+    """Real time: timers are plain QTimers."""
+
+    def timer(self, parent=None):
+        return QTimer(parent)
+
+    def now(self):
+        return time.monotonic() * 1000
+
+# SimulatedTimer Class
+class SimulatedTimer(QObject):
+    """The parts of the QTimer API the widgets use, driven by SimulatedClock.advance()."""
+    timeout = Signal()
+
+    def __init__(self, clock, sequence, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.sequence = sequence
+        self.interval_ms = 0
+        self.single_shot = False
+        self.due = None
+
+    def setInterval(self, interval):
+        self.interval_ms = interval
+
+    def interval(self):
+        return self.interval_ms
+
+    def setSingleShot(self, single_shot):
+        self.single_shot = single_shot
+
+    def isSingleShot(self):
+        return self.single_shot
+
+    def setTimerType(self, timer_type):
+        pass
+
+    def isActive(self):
+        return self.due is not None
+
+    def start(self, interval=None):
+        if interval is not None:
+            self.interval_ms = interval
+        self.due = self.clock.time + self.interval_ms
+
+    def stop(self):
+        self.due = None
+
+    def fire(self):
+        # A zero interval still has to move forward or advance() would never return
+        self.due = None if self.single_shot else self.due + max(self.interval_ms, 1)
+        self.timeout.emit()
+
+# SimulatedClock Class
+class SimulatedClock:
+    """Virtual time that only moves when advance() is called; timers fire in due order."""
+
+    def __init__(self):
+        self.time = 0
+        self.timers = []
+
+    def timer(self, parent=None):
+        timer = SimulatedTimer(self, len(self.timers), parent)
+        self.timers.append(timer)
+        return timer
+
+    def now(self):
+        return self.time
+
+    def next_due(self, until):
+        due = None
+        for timer in self.timers[:]:
+            if not shiboken6.isValid(timer):
+                # Deleted along with its parent widget
+                self.timers.remove(timer)
+            elif timer.due is not None and timer.due <= until and (due is None or (timer.due, timer.sequence) < (due.due, due.sequence)):
+                due = timer
+        return due
+
+    def advance(self, ms):
+        """Move time forward by ms, firing every timer that falls due on the way."""
+        end = self.time + ms
+        timer = self.next_due(end)
+        while timer is not None:
+            self.time = timer.due
+            timer.fire()
+            timer = self.next_due(end)
+        self.time = end
+
+clock = QtClock()
+
+def set_clock(new_clock):
+    global clock
+    clock = new_clock
+    return clock
 
 def clean_song_name(filename):
     """Process a song filename to extract a clean song title."""
@@ -47,11 +1605,12 @@ class HeartAnimationWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAttribute(Qt.WA_TransparentForMouseEvents)
-        self.setStyleSheet("background-color: transparent;")
+        set_role(self, "page")
         self.hearts = []
-        self.heart_timer = QTimer(self)
+        self.heart_timer = clock.timer(self)
         self.heart_timer.timeout.connect(self.update_hearts)
         self.heart_timer.start(100)
+        profile_widget(self, "hearts")
 
     def update_hearts(self):
         if random.random() < 0.2:
@@ -93,119 +1652,6 @@ class HeartAnimationWidget(QWidget):
         painter.end()
 
 
-# PlaylistTab Class
-class PlaylistTab(QWidget):
-    def __init__(self, player, playlist, playlist_widget, parent=None):
-        super().__init__(parent)
-        self.player = player
-        self.playlist = playlist
-        self.playlist_widget = playlist_widget
-        self.setStyleSheet("background-color: #0d0d0d;")
-
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(40, 40, 40, 40)
-        layout.setSpacing(20)
-
-        title_label = QLabel("🎵 Your LoveBox Playlist 🎵")
-        title_label.setStyleSheet("color: #4fc3f7; font-size: 24px; font-weight: bold;")
-        font = QFont("Georgia", 24)
-        font.setItalic(True)
-        title_label.setFont(font)
-        title_label.setAlignment(Qt.AlignCenter)
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(30)
-        glow.setColor(QColor(255, 255, 255, 180))
-        glow.setOffset(0, 0)
-        title_label.setGraphicsEffect(glow)
-        layout.addWidget(title_label)
-
-        self.song_list = QListWidget()
-        self.song_list.setStyleSheet("""
-            QListWidget {
-                background-color: #0d0d0d;
-                color: #4fc3f7;
-                border: 2px solid #4682b4;
-                font-size: 16px;
-            }
-            QListWidget::item:selected {
-                background-color: #4682b4;
-                color: #0d0d0d;
-            }
-        """)
-        self.song_list.setFont(QFont("Georgia", 16))
-        self.update_song_list()
-        self.song_list.itemClicked.connect(self.play_selected_song)
-        layout.addWidget(self.song_list)
-
-        control_layout = QHBoxLayout()
-        control_layout.setSpacing(10)
-
-        prev_button = QPushButton("⏮ Previous")
-        prev_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        prev_button.setFont(QFont("Georgia", 14))
-        prev_button.clicked.connect(self.playlist_widget.play_previous)
-        control_layout.addWidget(prev_button)
-
-        self.play_pause_button = QPushButton("⏸ Pause")
-        self.play_pause_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        self.play_pause_button.setFont(QFont("Georgia", 14))
-        self.play_pause_button.clicked.connect(self.toggle_play_pause)
-        control_layout.addWidget(self.play_pause_button)
-
-        next_button = QPushButton("Next ⏭")
-        next_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        next_button.setFont(QFont("Georgia", 14))
-        next_button.clicked.connect(self.playlist_widget.play_next)
-        control_layout.addWidget(next_button)
-
-        play_next_button = QPushButton("Play Next ⏩")
-        play_next_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        play_next_button.setFont(QFont("Georgia", 14))
-        play_next_button.clicked.connect(self.add_to_play_next)
-        control_layout.addWidget(play_next_button)
-
-        layout.addLayout(control_layout)
-
-        self.playlist_widget.current_song_changed.connect(self.update_song_list_selection)
-
-    def update_song_list(self):
-        self.song_list.clear()
-        for idx, (song_name, _) in enumerate(self.playlist):
-            display_name = song_name
-            if (song_name, self.playlist[idx][1]) in self.playlist_widget.play_next_queue:
-                queue_pos = self.playlist_widget.play_next_queue.index((song_name, self.playlist[idx][1])) + 1
-                display_name = f"{song_name} [Next #{queue_pos}]"
-            item = QListWidgetItem(display_name)
-            self.song_list.addItem(item)
-
-    def play_selected_song(self, item):
-        song_name = item.text().split(" [Next")[0]
-        for idx, (name, _) in enumerate(self.playlist):
-            if name == song_name:
-                self.playlist_widget.set_current_index(idx)
-                self.play_pause_button.setText("⏸ Pause")
-                self.song_list.setCurrentRow(idx)
-                break
-
-    def update_song_list_selection(self, index):
-        self.update_song_list()
-        self.song_list.setCurrentRow(index)
-
-    def toggle_play_pause(self):
-        self.playlist_widget.toggle_play_pause()
-        self.play_pause_button.setText("▶ Play" if not self.playlist_widget.is_playing else "⏸ Pause")
-
-    def add_to_play_next(self):
-        selected_items = self.song_list.selectedItems()
-        if selected_items:
-            song_name = selected_items[0].text().split(" [Next")[0]
-            for idx, (name, path) in enumerate(self.playlist):
-                if name == song_name:
-                    self.playlist_widget.add_to_play_next((name, path))
-                    self.update_song_list()
-                    break
-
-
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QDialog, QTextEdit, QHBoxLayout, QLabel
 from PySide6.QtGui import QFont, QPixmap, QIcon
 from PySide6.QtCore import Qt
@@ -233,33 +1679,155 @@ from PySide6.QtGui import QFont, QPixmap, QIcon, QPalette, QBrush
 from PySide6.QtCore import Qt
 import os
 
+# DetailPanel Class
+class DetailPanel(QFrame):
+    """Overlay shown over the main window for letters and qualities, built once and reused."""
+    image_requested = Signal(str, bool)
+    image_size = QSize(250, 250)
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_StyledBackground)
+        self.pixmap_cache = {}
+        self.image_labels = []
+        self.image_cells = []
+        self.requested_size = (300, 200)
+
+        outer_layout = QVBoxLayout(self)
+        outer_layout.setAlignment(Qt.AlignCenter)
+
+        self.card = QFrame()
+        self.card.setObjectName("detailCard")
+        outer_layout.addWidget(self.card, alignment=Qt.AlignCenter)
+
+        card_layout = QVBoxLayout(self.card)
+        font = ui_font(14, italic=True)
+
+        self.title_label = QLabel("")
+        set_role(self.title_label, "text", 18, bold=True)
+        self.title_label.setFont(ui_font(18, bold=True))
+        self.title_label.setAlignment(Qt.AlignCenter)
+        apply_glow(self.title_label, 20, QColor(255, 255, 255, 180))
+        card_layout.addWidget(self.title_label)
+
+        self.images_grid = QGridLayout()
+        card_layout.addLayout(self.images_grid)
+
+        self.text_view = QTextEdit()
+        self.text_view.setReadOnly(True)
+        set_role(self.text_view, "field", 14)
+        self.text_view.setFont(font)
+        card_layout.addWidget(self.text_view)
+
+        self.close_button = QPushButton("Close")
+        set_role(self.close_button, "accent", 12, bold=True)
+        self.close_button.setFont(font)
+        self.close_button.clicked.connect(self.hide)
+        card_layout.addWidget(self.close_button, alignment=Qt.AlignCenter)
+
+        parent.installEventFilter(self)
+        self.setGeometry(parent.rect())
+        self.hide()
+
+    def show_detail(self, title, text, images=(), size=(300, 200), columns=None, center_text=False):
+        record_event("dialog", title)
+        self.title_label.setText(title)
+        self.text_view.setPlainText(text)
+        self.text_view.selectAll()
+        self.text_view.setAlignment(Qt.AlignCenter if center_text else Qt.AlignLeft)
+        self.text_view.moveCursor(QTextCursor.Start)
+
+        columns = columns or max(len(images), 1)
+        while len(self.image_labels) < len(images):
+            image_label = QLabel()
+            image_label.setAlignment(Qt.AlignCenter)
+            self.image_labels.append(image_label)
+            self.image_cells.append(None)
+        for i, image_label in enumerate(self.image_labels):
+            if i < len(images):
+                image_label.setPixmap(self.load_pixmap(images[i]))
+                # Only touch the layout when the label moves to a different cell
+                cell = (i // columns, i % columns)
+                if self.image_cells[i] != cell:
+                    if self.image_cells[i] is not None:
+                        self.images_grid.removeWidget(image_label)
+                    self.images_grid.addWidget(image_label, *cell)
+                    self.image_cells[i] = cell
+                image_label.show()
+            elif self.image_cells[i] is not None:
+                self.images_grid.removeWidget(image_label)
+                self.image_cells[i] = None
+                image_label.hide()
+
+        self.requested_size = size
+        self.setGeometry(self.parentWidget().rect())
+        self.fit_card()
+        self.show()
+        self.raise_()
+        self.close_button.setFocus()
+
+    def load_pixmap(self, image_path):
+        pixmap = self.pixmap_cache.get(image_path)
+        self.image_requested.emit(image_path, pixmap is not None)
+        if pixmap is None:
+            image = assets.thumbnail(image_path, self.image_size)
+            if not image.isNull():
+                pixmap = QPixmap.fromImage(image)
+                image_log.debug("Image loaded: %s", image_path)
+            else:
+                pixmap = QPixmap(250, 250)
+                pixmap.fill(Qt.black)
+                image_log.warning("Image not found: %s", image_path)
+            self.pixmap_cache[image_path] = pixmap
+        return pixmap
+
+    def fit_card(self):
+        # The overlay lives inside the window, so never let the card outgrow it
+        width, height = self.requested_size
+        self.card.setFixedSize(min(width, self.width() - 40), min(height, self.height() - 40))
+
+    def eventFilter(self, obj, event):
+        if obj is self.parentWidget() and event.type() == event.Type.Resize:
+            self.setGeometry(obj.rect())
+            self.fit_card()
+        return super().eventFilter(obj, event)
+
+    def mousePressEvent(self, event):
+        if not self.card.geometry().contains(event.position().toPoint()):
+            self.hide()
+        event.accept()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.hide()
+        else:
+            super().keyPressEvent(event)
+
+def detail_panel_for(widget):
+    """Return the shared detail panel of the widget's window, creating it on first use."""
+    window = widget.window()
+    panel = window.findChild(DetailPanel)
+    if panel is None:
+        panel = DetailPanel(window)
+    return panel
+
 class FriendsMessagesTab(QWidget):
     def __init__(self):
         super().__init__()
         
-        # Set script directory dynamically
-        self.script_dir = os.path.dirname(os.path.abspath(__file__))
-        background_image = r"c:\Users\DHI\Desktop\OWLB\beach.jpg"
-        
         # Set background image using QLabel for better control
         self.background_label = QLabel(self)
-        if os.path.exists(background_image):
-            pixmap = QPixmap(background_image).scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.background_label.setPixmap(pixmap)
+        self.background_pixmap = assets.pixmap("beach.jpg")
+        if not self.background_pixmap.isNull():
+            self.background_label.setPixmap(self.background_pixmap.scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
             self.background_label.setScaledContents(True)
             self.background_label.setGeometry(0, 0, self.width(), self.height())
-            print(f"Background image loaded: {background_image}")
+            image_log.debug("Background image loaded: beach.jpg")
         else:
-            print(f"Background image not found: {background_image}")
-            self.setStyleSheet("background: qlineargradient(x1:0, y1:0, x2:0, y2:1, stop:0 #1e3a8a, stop:1 #0d0d0d);")
+            image_log.warning("Background image not found: beach.jpg")
         
-        # Semi-transparent overlay with reduced opacity
-        self.setStyleSheet("""
-            QWidget {
-                background-color: rgba(13, 13, 13, 0.6);
-                color: #4fc3f7;
-            }
-        """)
+        # Semi-transparent overlay with reduced opacity comes from the theme
+        self.setObjectName("friendsTab")
         
         # Main layout
         main_layout = QHBoxLayout(self)
@@ -274,31 +1842,23 @@ class FriendsMessagesTab(QWidget):
         button_layout.setAlignment(Qt.AlignRight | Qt.AlignTop)
         button_layout.setSpacing(10)
 
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
+        font = ui_font(14, italic=True)
 
         # Decorative header
         title_label = QLabel("Letters from Friends 💌🌟")
-        title_label.setStyleSheet("color: #4fc3f7; font-size: 18px; font-style: italic;")
+        set_role(title_label, "text", 18)
         title_label.setAlignment(Qt.AlignCenter)
         title_label.setFont(font)
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(10)
-        glow.setColor(QColor(79, 195, 247, 180))
-        glow.setOffset(0, 0)
-        title_label.setGraphicsEffect(glow)
+        apply_glow(title_label, 10, QColor(79, 195, 247, 180))
         button_layout.addWidget(title_label)
 
-        self.image_dir = os.path.join(self.script_dir, "P")
-        print(f"Image directory: {self.image_dir}")
-
-        # Messages and image paths
+        # Messages and image asset names
         self.friends_data = [
             {
                 "name": "Jahnavi",
                 "message": """Hey manyaaaa I love youuuu soooo much u really matter a lot in my life and Idk how would my school life would be without u there okayyyy soo it's 16 yearrrr to uss and a longgg more to go 💖 
 To say my best memory with u how can I even think I feel everything is bestest but one of my favourite is our ukg class and us sitting near windows and our favourite teacher heheheee anyways happiest 21th birthday manya 🎂🥳🥳🥳always be happy and be smiling and I will always be there for you uk I really doooo🤧💞""",
-                "images": [os.path.join(self.image_dir, "j1.jpg")]
+                "images": ["P/j1.jpg"]
             },
             {
                 "name": "Sanjana",
@@ -311,22 +1871,22 @@ You've always been there for me. Cheering me on, listening, and being your amazi
 
 "Your slightly chaotic but awesome bestie
 Sanjana😉""",
-                "images": [os.path.join(self.image_dir, "sa1.jpg")]
+                "images": ["P/sa1.jpg"]
             },
             {
                 "name": "Manas",
                 "message": """Hellooo, Manas here :D, we have been friends for a long long time and I am really proud of that! Lots of favourite moments with you, but if i had to choose one i would always go for the time we spent at Base during 10th! That was the time we first met. Was amazing! Our usual gang all of us together just gossiping for 4 hours not worried about anything, was really fun hehe :). And firstYr Aatmatrisha at PES as well was greet with you, our first concert it was and we spent it well 💪🏻 Thank you so much for everything and a very happy birthday !!! 🥳🥳""",
-                "images": [os.path.join(self.image_dir, "m1.jpg")]
+                "images": ["P/m1.jpg"]
             },
             {
                 "name": "Shivani",
                 "message": """I have so many fun memories with manya but my favourite has to be us in wms and crypto class where we used to go to class just for the attendance and talk the entire time lol. We even got caught a few times in wms but it was funny. We had this tradition on Tuesdays, when the wms sir gave us breaks, we’d go down and buy bun samosa and roam around. Other than that, I always liked when we used to go get dahi puri or cheese maggi and just chill in clg.""",
                 "images": [
-                    os.path.join(self.image_dir, "s1.jpg"),
-                    os.path.join(self.image_dir, "s2.jpg"),
-                    os.path.join(self.image_dir, "s3.jpg"),
-                    os.path.join(self.image_dir, "s4.jpg"),
-                    os.path.join(self.image_dir, "s5.jpg")
+                    "P/s1.jpg",
+                    "P/s2.jpg",
+                    "P/s3.jpg",
+                    "P/s4.jpg",
+                    "P/s5.jpg"
                 ]
             },
             {
@@ -342,9 +1902,9 @@ Your life is a beautiful rollercoaster, and I feel so incredibly lucky to be on
 
 Happy Birthday, my honeychillipatootieeilysm""",
                 "images": [
-                    os.path.join(self.image_dir, "mo1.jpg"),
-                    os.path.join(self.image_dir, "mo2.jpg"),
-                    os.path.join(self.image_dir, "mo3.jpg")
+                    "P/mo1.jpg",
+                    "P/mo2.jpg",
+                    "P/mo3.jpg"
                 ]
             },
 
@@ -377,7 +1937,7 @@ Have a great day and a great year! I really have more to add on, I will do it ag
 Im glad and honoured by the fact that you are a part of my life and knowing you has been the biggest pleasure of life
 HAPPY BIRTHDAY!!!""",
                 "images": [
-                    os.path.join(self.image_dir, "pr1.jpg")
+                    "P/pr1.jpg"
                 ]
             }
 
@@ -386,42 +1946,19 @@ HAPPY BIRTHDAY!!!""",
 
         ]
 
-        # Debug print for image paths
-        for friend in self.friends_data:
-            for image in friend["images"]:
-                print(f"Loading image for {friend['name']}: {image}")
+        if image_log.isEnabledFor(logging.DEBUG):
+            for friend in self.friends_data:
+                for image in friend["images"]:
+                    image_log.debug("Image for %s: %s", friend["name"], image)
 
         # Create buttons with heart icon
-        heart_icon_path = os.path.join(self.script_dir, "heart_icon.png")
-        heart_icon = QIcon(heart_icon_path) if os.path.exists(heart_icon_path) else QIcon()
+        heart_icon = assets.icon("heart_icon.png")
         for friend in self.friends_data:
             button = QPushButton(friend["name"])
             button.setIcon(heart_icon)
-            button.setStyleSheet("""
-                QPushButton {
-                    background-color: #4682b4;
-                    color: #0d0d0d;
-                    font-size: 14px;
-                    font-weight: bold;
-                    padding: 12px;
-                    border-radius: 10px;
-                    margin: 8px;
-                    border: 2px solid #4fc3f7;
-                    min-width: 200px;
-                    text-align: left;
-                }
-                QPushButton:hover {
-                    background-color: #4fc3f7;
-                    color: #0d0d0d;
-                    border: 2px solid #ffffff;
-                }
-            """)
+            set_role(button, "letter")
             button.setFont(font)
-            shadow = QGraphicsDropShadowEffect()
-            shadow.setColor(QColor("#4fc3f7"))
-            shadow.setBlurRadius(5)
-            shadow.setOffset(0, 0)
-            button.setGraphicsEffect(shadow)
+            apply_glow(button, 5, QColor("#4fc3f7"))
             button.clicked.connect(lambda checked, f=friend: self.show_message(f["name"], f["message"], f["images"]))
             button_layout.addWidget(button)
 
@@ -429,187 +1966,161 @@ HAPPY BIRTHDAY!!!""",
         main_layout.addLayout(button_layout)
 
     def show_message(self, name, message, images):
-        dialog = QDialog(self)
-        dialog.setWindowTitle(f"Message from {name}")
-        dialog.setStyleSheet("background-color: #0d0d0d; color: #4fc3f7;")
-        dialog_size = (1100, 600) if name == "Shivani" else (900, 600) if name == "Mohita" else (700, 500)
-        dialog.setFixedSize(*dialog_size)
-
-        layout = QVBoxLayout(dialog)
+        size = (1100, 600) if name == "Shivani" else (900, 600) if name == "Mohita" else (700, 500)
+        detail_panel_for(self).show_detail(f"Message from {name}", message, images, size=size, columns=3)
 
-        # Image display
-        if name == "Shivani":
-            images_layout = QVBoxLayout()
-            top_row = QHBoxLayout()
-            bottom_row = QHBoxLayout()
-            for i, image_path in enumerate(images):
-                image_label = QLabel()
-                if os.path.exists(image_path):
-                    pixmap = QPixmap(image_path).scaled(250, 250, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    print(f"Image loaded successfully: {image_path}")
-                else:
-                    pixmap = QPixmap(250, 250)
-                    pixmap.fill(Qt.black)
-                    print(f"Image not found: {image_path}")
-                image_label.setPixmap(pixmap)
-                image_label.setAlignment(Qt.AlignCenter)
-                if i < 3:
-                    top_row.addWidget(image_label)
-                else:
-                    bottom_row.addWidget(image_label)
-            images_layout.addLayout(top_row)
-            images_layout.addLayout(bottom_row)
-            layout.addLayout(images_layout)
-        else:
-            images_layout = QHBoxLayout()
-            for image_path in images:
-                image_label = QLabel()
-                if os.path.exists(image_path):
-                    pixmap = QPixmap(image_path).scaled(250, 250, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    print(f"Image loaded successfully: {image_path}")
-                else:
-                    pixmap = QPixmap(250, 250)
-                    pixmap.fill(Qt.black)
-                    print(f"Image not found: {image_path}")
-                image_label.setPixmap(pixmap)
-                image_label.setAlignment(Qt.AlignCenter)
-                images_layout.addWidget(image_label)
-            layout.addLayout(images_layout)
-
-        # Message display
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setStyleSheet("background-color: #0d0d0d; color: #4fc3f7; font-size: 14px; border: 1px solid #4682b4;")
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
-        text_edit.setFont(font)
-        text_edit.setPlainText(message)
-        layout.addWidget(text_edit)
-
-        dialog.exec()
-
-    def resizeEvent(self, event):
-        self.background_label.setGeometry(0, 0, self.width(), self.height())
-        if self.background_label.pixmap():
-            self.background_label.setPixmap(self.background_label.pixmap().scaled(self.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation))
-        super().resizeEvent(event)
     def resizeEvent(self, event):
-        # Resize background label to match widget size
+        # Rescale from the original, decoded once, to match the widget size
         if hasattr(self, 'background_label'):
             self.background_label.setGeometry(0, 0, self.width(), self.height())
-            background_image = r"c:\Users\DHI\Desktop\OWLB\beach.jpg"
-            if os.path.exists(background_image):
-                pixmap = QPixmap(background_image).scaled(self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
-                self.background_label.setPixmap(pixmap)
-                print(f"Background resized: {background_image}")
-            else:
-                print(f"Background image not found on resize: {background_image}")
+            if not self.background_pixmap.isNull():
+                self.background_label.setPixmap(self.background_pixmap.scaled(self.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation))
         super().resizeEvent(event)
         
+# ImageDecodeSignals Class
+class ImageDecodeSignals(QObject):
+    decoded = Signal(int, QImage)
+    failed = Signal(int, str)
+
+# ImageDecodeTask Class
+class ImageDecodeTask(QRunnable):
+    """Load one image asset at thumbnail size on a QThreadPool worker."""
+
+    def __init__(self, slot, name, size):
+        super().__init__()
+        self.slot = slot
+        self.name = name
+        self.size = size
+        # Created on the GUI thread, so emits from the worker are queued back to it
+        self.signals = ImageDecodeSignals()
+
+    def run(self):
+        if not assets.exists(self.name):
+            self.signals.failed.emit(self.slot, f"Image not found: {self.name}")
+            return
+        # Straight out of the asset pack when it has this size, otherwise decoded downscaled
+        image = assets.thumbnail(self.name, self.size)
+        if image.isNull():
+            self.signals.failed.emit(self.slot, f"Failed to load image: {self.name}")
+        else:
+            self.signals.decoded.emit(self.slot, image)
+
 # PasswordDialog Class
 class PasswordDialog(QDialog):
-    def __init__(self, player, audio_output, playlist):
+    thumbnail_size = QSize(150, 150)
+
+    def __init__(self, player, audio_output, session):
         super().__init__()
         self.player = player
         self.audio_output = audio_output
-        self.playlist = playlist
+        self.session = session
         self.setWindowTitle("Unlock LoveBox")
         self.attempts = 0
         self.correct_answers = ["peter", "peter kavinsky"]
-
-        self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.media_started = False
+        self.decode_tasks = []
 
         layout = QVBoxLayout(self)
         layout.setSpacing(10)
-        self.setStyleSheet("background-color: #0d0d0d;")
+        set_role(self, "dark")
 
         self.top_image_grid = QGridLayout()
         self.top_image_grid.setSpacing(10)
-        self.add_top_images()
         layout.addLayout(self.top_image_grid)
 
         self.label = QLabel("🔒 Enter Password to Unlock:")
-        self.label.setStyleSheet("color: #4fc3f7; font-size: 18px; font-weight: bold;")
-        font = QFont("Georgia", 18)
-        font.setItalic(True)
+        set_role(self.label, "text", 18, bold=True)
+        font = ui_font(18, italic=True)
         self.label.setFont(font)
         self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.label)
 
         self.input = QLineEdit()
-        self.input.setStyleSheet("background-color: #0d0d0d; color: #4fc3f7; font-size: 16px; border: 1px solid #4682b4;")
+        set_role(self.input, "field", 16)
         self.input.setFont(font)
         layout.addWidget(self.input)
 
         self.button = QPushButton("Unlock")
-        self.button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 16px; font-weight: bold;")
+        set_role(self.button, "accent", 16, bold=True)
         self.button.setFont(font)
         self.button.clicked.connect(self.check_password)
         layout.addWidget(self.button)
 
         self.hint_label = QLabel("")
-        self.hint_label.setStyleSheet("color: #4fc3f7; font-size: 16px;")
+        set_role(self.hint_label, "text", 16)
         self.hint_label.setFont(font)
         self.hint_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(self.hint_label)
 
+        self.media_label = QLabel("")
+        set_role(self.media_label, "text", 12)
+        self.media_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.media_label)
+
         self.bottom_image_grid = QGridLayout()
         self.bottom_image_grid.setSpacing(10)
-        self.add_bottom_images()
         layout.addLayout(self.bottom_image_grid)
 
-        self.play_first_song()
+        # Placeholders paint straight away; the decoded photos replace them as they arrive
+        self.image_labels = []
+        self.add_image_placeholders(self.top_image_grid, ["P1.jpg", "p2.jpg", "P3.jpg"])
+        self.add_image_placeholders(self.bottom_image_grid, ["p4.jpg", "p5.jpg", "P6.jpg"])
 
-    def add_top_images(self):
-        image_filenames = ["P1.jpg", "p2.jpg", "P3.jpg"]
-        image_dir = os.path.join(self.script_dir, "P")
-        
+    def add_image_placeholders(self, grid, image_filenames):
         for idx, filename in enumerate(image_filenames):
-            image_path = os.path.join(image_dir, filename)
-            image_label = QLabel()
-            if os.path.exists(image_path):
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    image_label.setPixmap(pixmap)
-                    image_label.setAlignment(Qt.AlignCenter)
-                    image_label.setStyleSheet("border: 2px solid #4682b4; border-radius: 10px;")
-                    self.top_image_grid.addWidget(image_label, 0, idx)
-                else:
-                    print(f"Failed to load image: {image_path}")
-            else:
-                print(f"Image not found: {image_path}")
+            image_label = QLabel("💖")
+            # Room for the thumbnail border around the photo
+            image_label.setFixedSize(self.thumbnail_size + QSize(4, 4))
+            image_label.setAlignment(Qt.AlignCenter)
+            set_role(image_label, "thumbnail")
+            grid.addWidget(image_label, 0, idx)
+
+            task = ImageDecodeTask(len(self.image_labels), f"P/{filename}", self.thumbnail_size)
+            task.signals.decoded.connect(self.set_image)
+            task.signals.failed.connect(self.drop_image)
+            self.image_labels.append(image_label)
+            self.decode_tasks.append(task)
+            QThreadPool.globalInstance().start(task)
+
+    def set_image(self, slot, image):
+        self.image_labels[slot].setPixmap(QPixmap.fromImage(image))
+
+    def drop_image(self, slot, message):
+        image_log.warning("%s", message)
+        self.image_labels[slot].hide()
 
-    def add_bottom_images(self):
-        image_filenames = ["p4.jpg", "p5.jpg", "P6.jpg"]
-        image_dir = os.path.join(self.script_dir, "P")
-        
-        for idx, filename in enumerate(image_filenames):
-            image_path = os.path.join(image_dir, filename)
-            image_label = QLabel()
-            if os.path.exists(image_path):
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    pixmap = pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    image_label.setPixmap(pixmap)
-                    image_label.setAlignment(Qt.AlignCenter)
-                    image_label.setStyleSheet("border: 2px solid #4682b4; border-radius: 10px;")
-                    self.bottom_image_grid.addWidget(image_label, 0, idx)
-                else:
-                    print(f"Failed to load image: {image_path}")
-            else:
-                print(f"Image not found: {image_path}")
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Open the first song only once the dialog has had a chance to paint
+        if not self.media_started:
+            self.media_started = True
+            QTimer.singleShot(0, self.play_first_song)
 
     def play_first_song(self):
-        if self.playlist:
-            audio_path = self.playlist[0][1]
+        if len(self.session):
+            song_name, audio_path = self.session.track(self.session.current_track())
             if os.path.exists(audio_path):
-                print(f"Playing audio: {audio_path}")
+                media_log.info("Opening audio: %s", audio_path)
+                self.media_label.setText(f"🎵 Loading {song_name}...")
+                self.player.mediaStatusChanged.connect(self.handle_media_status)
+                self.player.errorOccurred.connect(self.handle_media_error)
+                apply_track_gain(self.audio_output, audio_path)
                 self.player.setSource(QUrl.fromLocalFile(audio_path))
-                self.audio_output.setVolume(0.5)
                 self.player.play()
+                record_event("play", audio_path, song_name)
             else:
-                print(f"Audio file not found: {audio_path}")
+                media_log.warning("Audio file not found: %s", audio_path)
+                self.media_label.setText("🎵 Music unavailable")
+
+    def handle_media_status(self, status):
+        if status in (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia):
+            self.media_label.setText(f"🎵 Now playing: {self.session.current_name()}")
+        elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+            self.media_label.setText("🎵 Music unavailable")
+
+    def handle_media_error(self, error):
+        media_log.error("Media player error: %s (error code: %s)", self.player.errorString(), error)
+        self.media_label.setText("🎵 Music unavailable")
 
     def check_password(self):
         text = self.input.text().strip().lower()
@@ -624,6 +2135,16 @@ class PasswordDialog(QDialog):
             else:
                 self.hint_label.setText("Try again!")
 
+    def done(self, result):
+        # The player outlives the dialog, so stop reporting its status here
+        if self.media_started and len(self.session):
+            try:
+                self.player.mediaStatusChanged.disconnect(self.handle_media_status)
+                self.player.errorOccurred.disconnect(self.handle_media_error)
+            except (RuntimeError, TypeError):
+                pass
+        super().done(result)
+
     def closeEvent(self, event):
         super().closeEvent(event)
 
@@ -632,7 +2153,7 @@ class PasswordDialog(QDialog):
 class HomeTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent;")
+        set_role(self, "page")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(40, 40, 40, 40)
         layout.setSpacing(30)
@@ -640,15 +2161,10 @@ class HomeTab(QWidget):
         # Jake Peralta-themed heading
         heading = QLabel("💖 Welcome to Your Nine-Nine LoveBox, My Amy! 💖")
         heading.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        font = QFont("Georgia", 36)
-        font.setItalic(True)
+        font = ui_font(36, italic=True)
         heading.setFont(font)
-        heading.setStyleSheet("color: #4fc3f7; border: 2px solid #4682b4; border-radius: 10px; padding: 10px;")
-        glow_heading = QGraphicsDropShadowEffect()
-        glow_heading.setBlurRadius(40)
-        glow_heading.setColor(QColor(255, 255, 255, 180))
-        glow_heading.setOffset(0, 0)
-        heading.setGraphicsEffect(glow_heading)
+        set_role(heading, "boxedTitle")
+        apply_glow(heading, 40, QColor(255, 255, 255, 180))
         layout.addWidget(heading)
 
         # Jake-inspired romantic message
@@ -660,28 +2176,19 @@ class HomeTab(QWidget):
             "EVERY BUTTON IN THIS LOVEBOX IS CLICKABLE! PLEASE CLICK THEM ALL"
         )
         message.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        font_msg = QFont("Georgia", 18)
-        font_msg.setItalic(True)
+        font_msg = ui_font(18, italic=True)
         message.setFont(font_msg)
-        message.setStyleSheet("color: #4fc3f7;")
+        set_role(message, "text")
         message.setWordWrap(True)
-        glow_message = QGraphicsDropShadowEffect()
-        glow_message.setBlurRadius(30)
-        glow_message.setColor(QColor(255, 255, 255, 140))
-        glow_message.setOffset(0, 0)
-        message.setGraphicsEffect(glow_message)
+        apply_glow(message, 30, QColor(255, 255, 255, 140))
         layout.addWidget(message)
 
         # Jake’s love notes section
         love_notes_label = QLabel("Jake’s Love Notes 💌")
         love_notes_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        love_notes_label.setStyleSheet("color: #4fc3f7; font-size: 20px; font-weight: bold;")
-        love_notes_label.setFont(QFont("Georgia", 20, QFont.Weight.Bold))
-        glow_notes = QGraphicsDropShadowEffect()
-        glow_notes.setBlurRadius(30)
-        glow_notes.setColor(QColor(255, 255, 255, 180))
-        glow_notes.setOffset(0, 0)
-        love_notes_label.setGraphicsEffect(glow_notes)
+        set_role(love_notes_label, "text", 20, bold=True)
+        love_notes_label.setFont(ui_font(20, bold=True))
+        apply_glow(love_notes_label, 30, QColor(255, 255, 255, 180))
         layout.addWidget(love_notes_label)
 
         love_notes = [
@@ -694,8 +2201,8 @@ class HomeTab(QWidget):
         notes_layout.setSpacing(10)
         for idx, note in enumerate(love_notes):
             note_label = QLabel(note)
-            note_label.setStyleSheet("color: #4fc3f7; font-size: 14px; border: 1px solid #4682b4; border-radius: 5px; padding: 5px;")
-            note_label.setFont(QFont("Georgia", 14))
+            set_role(note_label, "note", 14)
+            note_label.setFont(ui_font(14))
             note_label.setWordWrap(True)
             note_label.setAlignment(Qt.AlignCenter)
             notes_layout.addWidget(note_label, idx // 2, idx % 2)
@@ -710,200 +2217,258 @@ class HomeTab(QWidget):
         ]
         self.catchphrase_index = 0
         self.catchphrase_button = QPushButton(self.catchphrases[self.catchphrase_index])
-        self.catchphrase_button.setStyleSheet("""
-            QPushButton {
-                background-color: #0d0d0d;
-                color: #4fc3f7;
-                border: 2px solid #4682b4;
-                border-radius: 10px;
-                padding: 10px;
-                font-size: 18px;
-            }
-            QPushButton:hover {
-                background-color: #4682b4;
-                color: #0d0d0d;
-            }
-        """)
-        self.catchphrase_button.setFont(QFont("Georgia", 18, QFont.Weight.Bold))
+        set_role(self.catchphrase_button, "outline", 18)
+        self.catchphrase_button.setFont(ui_font(18, bold=True))
         self.catchphrase_button.clicked.connect(self.cycle_catchphrase)
-        glow_catchphrase = QGraphicsDropShadowEffect()
-        glow_catchphrase.setBlurRadius(30)
-        glow_catchphrase.setColor(QColor(255, 255, 255, 180))
-        glow_catchphrase.setOffset(0, 0)
-        self.catchphrase_button.setGraphicsEffect(glow_catchphrase)
+        apply_glow(self.catchphrase_button, 30, QColor(255, 255, 255, 180))
         layout.addWidget(self.catchphrase_button, alignment=Qt.AlignCenter)
 
     def cycle_catchphrase(self):
         self.catchphrase_index = (self.catchphrase_index + 1) % len(self.catchphrases)
         self.catchphrase_button.setText(self.catchphrases[self.catchphrase_index])
 
+# PoemsModel Class
+class PoemsModel(QAbstractListModel):
+    def __init__(self, poems, parent=None):
+        super().__init__(parent)
+        self.poems = poems
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.poems)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.poems):
+            return None
+        if role == Qt.DisplayRole:
+            return self.poems[index.row()]
+        return None
+
+# PoemDelegate Class
+class PoemDelegate(QStyledItemDelegate):
+    columns = 2
+    min_width = 250
+    padding = 25
+    glow_radius = 20
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.font = ui_font(italic=True)
+        self.font.setPixelSize(16)
+        self.metrics = QFontMetrics(self.font)
+        self.heights = {}
+        self.border_pen = QPen(QColor("#4682b4"), 1)
+        self.background_brush = QBrush(QColor("#0d0d0d"))
+        self.bar_brush = QBrush(QColor("#4682b4"))
+        self.text_color = QColor("#4fc3f7")
+        self.glow_color = QColor(255, 255, 255, 180)
+
+    def column_width(self):
+        # QListView keeps room for a vertical scroll bar and wraps a row that would
+        # come within one spacing of the right edge, so leave a little slack
+        spacing = self.view.spacing()
+        bounds = self.view.maximumViewportSize().width() - self.view.verticalScrollBar().sizeHint().width() - 2
+        available = bounds - spacing * (self.columns + 2)
+        return max(self.min_width, available // self.columns)
+
+    def sizeHint(self, option, index):
+        width = self.column_width()
+        # Word-wrapped text height only depends on the poem and the column width
+        key = (index.row(), width)
+        height = self.heights.get(key)
+        if height is None:
+            text_width = width - 2 * self.padding
+            text_rect = self.metrics.boundingRect(QRect(0, 0, text_width, 0), Qt.AlignCenter | Qt.TextWordWrap, index.data(Qt.DisplayRole))
+            height = text_rect.height() + 2 * self.padding
+            self.heights[key] = height
+        return QSize(width, height)
+
+    def card_glow(self, size):
+        r = self.glow_radius
+        ratio = self.view.devicePixelRatioF()
+
+        def render():
+            card = QPixmap(round((size.width() + 2 * r) * ratio), round((size.height() + 2 * r) * ratio))
+            card.setDevicePixelRatio(ratio)
+            card.fill(Qt.transparent)
+            painter = QPainter(card)
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.background_brush)
+            painter.drawRoundedRect(QRectF(r, r, size.width(), size.height()), 10, 10)
+            painter.end()
+            return render_glow(card, r, self.glow_color)
+
+        return shared_glow(("poemCard", size.width(), size.height(), ratio, self.glow_color.rgba(), r), render)
+
+    def paint(self, painter, option, index):
+        rect = option.rect.adjusted(0, 0, -1, -1)
+
+        painter.save()
+        if glow_quality != "off":
+            r = self.glow_radius
+            painter.drawPixmap(rect.x() - r, rect.y() - r, self.card_glow(rect.size()))
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self.border_pen)
+        painter.setBrush(self.background_brush)
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 10, 10)
+
+        # Thicker accent bar down the left edge, like the old frame's border-left
+        bar = QPainterPath()
+        bar.addRoundedRect(QRectF(rect), 10, 10)
+        painter.setClipPath(bar)
+        painter.fillRect(QRect(rect.x(), rect.y(), 4, rect.height()), self.bar_brush)
+        painter.setClipping(False)
+
+        painter.setFont(self.font)
+        painter.setPen(self.text_color)
+        painter.drawText(rect.adjusted(self.padding, self.padding, -self.padding, -self.padding), Qt.AlignCenter | Qt.TextWordWrap, index.data(Qt.DisplayRole))
+        painter.restore()
+
 # PoemTab Class
 class PoemTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent;")
-        self.layout = QVBoxLayout(self)
-        self.layout.setContentsMargins(40, 40, 40, 40)
-        self.layout.setSpacing(20)
+        set_role(self, "page")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(40, 40, 40, 40)
 
-        self.init_main_view()
+        # Each view is built once and navigation just flips pages
+        self.stack = QStackedWidget()
+        layout.addWidget(self.stack)
+        self.main_view = self.init_main_view()
+        self.old_poems_view = None
+        self.new_poems_view = None
+        self.stack.addWidget(self.main_view)
 
     def init_main_view(self):
-        self.clear_layout()
+        view = QWidget()
+        layout = QVBoxLayout(view)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(20)
 
-        font = QFont("Georgia", 20)
-        font.setItalic(True)
+        font = ui_font(20, italic=True)
 
         self.old_button = QPushButton("📜 Old Poems")
         self.old_button.setFont(font)
-        self.old_button.setStyleSheet("""
-            QPushButton {
-                background-color: #0d0d0d;
-                color: #4fc3f7;
-                border: 2px solid #4682b4;
-                border-radius: 20px;
-                padding: 20px;
-                font-size: 20px;
-            }
-            QPushButton:hover {
-                background-color: #000000;
-                color: #4682b4;
-            }
-        """)
+        set_role(self.old_button, "pill", 20)
         self.old_button.clicked.connect(self.show_old_poems)
 
         self.new_button = QPushButton("📝 New Poems")
         self.new_button.setFont(font)
-        self.new_button.setStyleSheet("""
-            QPushButton {
-                background-color: #0d0d0d;
-                color: #4fc3f7;
-                border: 2px solid #4682b4;
-                border-radius: 20px;
-                padding: 20px;
-                font-size: 20px;
-            }
-            QPushButton:hover {
-                background-color: #000000;
-                color: #4682b4;
-            }
-        """)
+        set_role(self.new_button, "pill", 20)
         self.new_button.clicked.connect(self.show_new_poems)
 
-        self.layout.addStretch()
-        self.layout.addWidget(self.old_button)
-        self.layout.addWidget(self.new_button)
-        self.layout.addStretch()
+        layout.addStretch()
+        layout.addWidget(self.old_button)
+        layout.addWidget(self.new_button)
+        layout.addStretch()
+        return view
 
-    def show_old_poems(self):
-        self.clear_layout()
-        font = QFont("Georgia", 18)
-        font.setItalic(True)
+    def init_old_poems_view(self):
+        view = QWidget()
+        layout = QVBoxLayout(view)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(20)
+
+        font = ui_font(18, italic=True)
 
         title_label = QLabel("📜 Old Poems")
-        title_label.setStyleSheet("color: #4fc3f7; font-size: 24px; font-weight: bold;")
+        set_role(title_label, "text", 24, bold=True)
         title_label.setFont(font)
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        glow_title = QGraphicsDropShadowEffect()
-        glow_title.setBlurRadius(30)
-        glow_title.setColor(QColor(255, 255, 255, 180))
-        glow_title.setOffset(0, 0)
-        title_label.setGraphicsEffect(glow_title)
+        apply_glow(title_label, 30, QColor(255, 255, 255, 180))
 
-        poems = [
+        self.poems = [
             """She is moonlight and moonshine,\nThe gentle ray of white hope,\nThe warm sip of emotion,\nShe's the relief that comes after a drizzle.""",
             """She's prettier than any poem of mine,\nShe's nicer than any concoction of my words,\nHer smile could fix broken glass,\nHer eyes are the crown jewels,\nAnd she's as pure as the Ganges.""",
             """She's snuck into my life,\nIn the dead of night, like an owl,\nMy gods isn't she nice?\nOh she does fix my soul.""",
             """Sunflowers are admired by her,\nUnbeknownst, they envy her,\nFor even they cannot replicate her charm,\nAnd that smile, that makes the world feel warm."""
         ]
 
-        scroll_area = QScrollArea()
-        scroll_area.setStyleSheet("background-color: transparent; border: none;")
-        scroll_area.setWidgetResizable(True)
-
-        scroll_widget = QWidget()
-        scroll_layout = QGridLayout(scroll_widget)
-        scroll_layout.setSpacing(20)
-        scroll_layout.setContentsMargins(10, 10, 10, 10)
-
-        for idx, poem_text in enumerate(poems):
-            poem_frame = QFrame()
-            poem_frame.setStyleSheet("""
-                background-color: #0d0d0d;
-                border-left: 4px solid #4682b4;
-                border-top: 1px solid #4682b4;
-                border-right: 1px solid #4682b4;
-                border-bottom: 1px solid #4682b4;
-                border-radius: 10px;
-                padding: 15px;
-            """)
-
-            glow_effect = QGraphicsDropShadowEffect()
-            glow_effect.setBlurRadius(20)
-            glow_effect.setColor(QColor(255, 255, 255, 180))
-            glow_effect.setOffset(0, 0)
-            poem_frame.setGraphicsEffect(glow_effect)
-
-            poem_label = QLabel(poem_text)
-            poem_label.setStyleSheet("color: #4fc3f7; font-size: 16px; background-color: transparent; padding: 10px;")
-            poem_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            poem_label.setWordWrap(True)
-            poem_label.setFont(font)
-
-            frame_layout = QVBoxLayout(poem_frame)
-            frame_layout.setContentsMargins(10, 10, 10, 10)
-            frame_layout.addWidget(poem_label)
-
-            poem_frame.setMinimumWidth(250)
-
-            row = idx // 2
-            col = idx % 2
-            scroll_layout.addWidget(poem_frame, row, col)
-
-        scroll_widget.setLayout(scroll_layout)
-        scroll_area.setWidget(scroll_widget)
+        # Cards are painted by a delegate, so thousands of poems cost no widgets
+        self.poems_model = PoemsModel(self.poems, self)
+        self.poems_view = QListView()
+        set_role(self.poems_view, "grid")
+        self.poems_view.setModel(self.poems_model)
+        self.poems_view.setItemDelegate(PoemDelegate(self.poems_view))
+        self.poems_view.setFlow(QListView.LeftToRight)
+        self.poems_view.setWrapping(True)
+        self.poems_view.setResizeMode(QListView.Adjust)
+        self.poems_view.setMovement(QListView.Static)
+        self.poems_view.setSpacing(20)
+        self.poems_view.setLayoutMode(QListView.Batched)
+        self.poems_view.setSelectionMode(QListView.NoSelection)
+        self.poems_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.poems_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.poems_view.setFocusPolicy(Qt.NoFocus)
 
         back_button = QPushButton("⬅️ Go Back")
-        back_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 16px; font-weight: bold; padding: 10px;")
+        set_role(back_button, "accent", 16, bold=True, padded=True)
         back_button.setFont(font)
-        back_button.clicked.connect(self.init_main_view)
+        back_button.clicked.connect(self.show_main_view)
 
-        self.layout.addWidget(title_label)
-        self.layout.addWidget(scroll_area)
-        self.layout.addWidget(back_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(title_label)
+        layout.addWidget(self.poems_view)
+        layout.addWidget(back_button, alignment=Qt.AlignmentFlag.AlignCenter)
+        return view
+
+    def init_new_poems_view(self):
+        view = QWidget()
+        layout = QVBoxLayout(view)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(20)
 
-    def show_new_poems(self):
-        self.clear_layout()
         label = QLabel("📝 Welcome to the new poems corner...\n\nThe stars you love,\nI bottled them tight,\nThey whisper your name,\nIn silence and light.")
-        label.setStyleSheet("color: #4fc3f7; font-size: 20px;")
+        set_role(label, "text", 20)
         label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         label.setWordWrap(True)
-        label.setFont(QFont("Georgia", 18, QFont.Weight.Bold))
+        label.setFont(ui_font(18, bold=True))
 
         back_button = QPushButton("⬅️ Go Back")
-        back_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 16px; font-weight: bold; padding: 10px;")
-        back_button.setFont(QFont("Georgia", 14))
-        back_button.clicked.connect(self.init_main_view)
+        set_role(back_button, "accent", 16, bold=True, padded=True)
+        back_button.setFont(ui_font(14))
+        back_button.clicked.connect(self.show_main_view)
 
-        self.layout.addWidget(label)
-        self.layout.addWidget(back_button)
+        layout.addWidget(label)
+        layout.addWidget(back_button)
+        return view
+
+    def show_main_view(self):
+        self.stack.setCurrentWidget(self.main_view)
 
-    def clear_layout(self):
-        while self.layout.count():
-            child = self.layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+    def show_old_poems(self):
+        self.ensure_old_poems_view()
+        self.stack.setCurrentWidget(self.old_poems_view)
+
+    def show_new_poems(self):
+        self.ensure_new_poems_view()
+        self.stack.setCurrentWidget(self.new_poems_view)
+
+    def ensure_old_poems_view(self):
+        if self.old_poems_view is None:
+            self.old_poems_view = self.init_old_poems_view()
+            self.stack.addWidget(self.old_poems_view)
+
+    def ensure_new_poems_view(self):
+        if self.new_poems_view is None:
+            self.new_poems_view = self.init_new_poems_view()
+            self.stack.addWidget(self.new_poems_view)
+
+    def prewarm(self):
+        self.ensure_old_poems_view()
+        self.ensure_new_poems_view()
 
 # TerminalTab Class
 class TerminalTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent;")
+        set_role(self, "page")
         layout = QVBoxLayout(self)
         label = QLabel("> This will be your fake terminal soon 💻")
-        label.setStyleSheet("color: #4fc3f7; font-family: Consolas; font-size: 14px;")
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
+        set_role(label, "terminal", 14)
+        font = ui_font(14, italic=True)
         label.setFont(font)
         layout.addWidget(label)
 
@@ -911,37 +2476,31 @@ class TerminalTab(QWidget):
 class MemoriesTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent; color: #4fc3f7;")
+        set_role(self, "page")
         main_layout = QVBoxLayout(self)
 
         self.calendar = QCalendarWidget()
         self.calendar.setGridVisible(True)
-        self.calendar.setStyleSheet("""
-            QCalendarWidget QWidget { background-color: #0d0d0d; color: #4fc3f7; }
-            QCalendarWidget QAbstractItemView:enabled { color: #4fc3f7; selection-background-color: #4682b4; selection-color: #0d0d0d; }
-            QCalendarWidget QToolButton { background-color: #0d0d0d; color: #4fc3f7; }
-            QCalendarWidget QMenu { background-color: #0d0d0d; color: #4fc3f7; }
-        """)
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
+        self.calendar.setObjectName("memoriesCalendar")
+        font = ui_font(14, italic=True)
         self.calendar.setFont(font)
 
         self.story_display = QTextEdit()
         self.story_display.setReadOnly(True)
-        self.story_display.setStyleSheet("background-color: #0d0d0d; color: #4fc3f7; font-size: 14px; border: 1px solid #4682b4;")
+        set_role(self.story_display, "field", 14)
         self.story_display.setFont(font)
 
         self.gift_button = QPushButton("🎁 Gift")
-        self.gift_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px; font-weight: bold;")
+        set_role(self.gift_button, "accent", 14, bold=True)
         self.gift_button.setFont(font)
         self.gift_button.clicked.connect(self.open_gift)
 
         self.story_game_label = QLabel("🌟 Interactive story coming soon! 🌟")
-        self.story_game_label.setStyleSheet("color: #4fc3f7; font-size: 16px; font-style: italic;")
+        set_role(self.story_game_label, "text", 16)
         self.story_game_label.setAlignment(Qt.AlignCenter)
         self.story_game_label.setFont(font)
 
-        self.calendar.selectionChanged.connect(self.load_selected_date)
+        self.calendar.selectionChanged.connect(self.open_selected_date)
 
         main_layout.addWidget(self.calendar)
         main_layout.addWidget(self.story_display)
@@ -1008,27 +2567,31 @@ class MemoriesTab(QWidget):
 
         self.load_selected_date()
 
+    def open_selected_date(self):
+        record_event("memory", self.calendar.selectedDate().toString("yyyy-MM-dd"))
+        self.load_selected_date()
+
     def load_selected_date(self):
         date = self.calendar.selectedDate().toString("yyyy-MM-dd")
         story = self.stories.get(date, "No story for this date yet. But every day with you is special 💖")
         self.story_display.setPlainText(story)
 
     def open_gift(self):
+        record_event("dialog", "Virtual Gift Box")
         QMessageBox.information(self, "Virtual Gift Box", "🎁 You opened a virtual gift! More surprises coming soon! 🎉")
 
 # GamesTab Class
 class GamesTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent;")
+        set_role(self, "page")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(40, 40, 20, 40)
         layout.setSpacing(20)
 
         self.instruction_label = QLabel("💖 Navigate the Maze! Use arrow keys to move ❤️ to 💖")
-        self.instruction_label.setStyleSheet("color: #4fc3f7; font-size: 16px;")
-        font = QFont("Georgia", 16)
-        font.setItalic(True)
+        set_role(self.instruction_label, "text", 16)
+        font = ui_font(16, italic=True)
         self.instruction_label.setFont(font)
         self.instruction_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.instruction_label)
@@ -1047,9 +2610,12 @@ class GamesTab(QWidget):
         ]
         self.player_pos = [1, 1]
         self.cell_size = 40
+        self.cell_roles = {0: "path", 1: "wall", 2: "heart", 3: "heart"}
+        self.cell_text = {2: "❤️", 3: "💖"}
+        self.emoji_size = 24
 
         self.game_area = QWidget()
-        self.game_area.setStyleSheet("background-color: #0d0d0d; border: 2px solid #4682b4; border-radius: 10px;")
+        set_role(self.game_area, "panel")
         self.game_area.setFixedSize(10 * self.cell_size, 10 * self.cell_size)
         layout.addWidget(self.game_area, alignment=Qt.AlignCenter)
 
@@ -1063,6 +2629,10 @@ class GamesTab(QWidget):
                 label.move(col * self.cell_size, row * self.cell_size)
                 row_labels.append(label)
             self.labels.append(row_labels)
+        profile_widget(self.game_area, "maze")
+        for row_labels in self.labels:
+            for label in row_labels:
+                profile_widget(label, "maze")
 
         self.update_maze()
 
@@ -1076,36 +2646,22 @@ class GamesTab(QWidget):
         super().showEvent(event)
 
     def update_maze(self):
-        font = QFont("Georgia", 18)
-        font.setItalic(True)
         for row in range(10):
             for col in range(10):
                 label = self.labels[row][col]
-                label.setGraphicsEffect(None)
-                if self.maze[row][col] == 1:
-                    label.setStyleSheet("background-color: #0d0d0d; border: none;")
-                    label.setText("")
-                elif self.maze[row][col] == 0:
-                    label.setStyleSheet("background-color: #0d0d0d; border: 1px solid #4682b4;")
-                    label.setText("")
-                elif self.maze[row][col] == 2:
-                    label.setStyleSheet("background-color: #0d0d0d; color: #4fc3f7; border: 1px solid #4682b4;")
-                    label.setText("❤️")
-                    label.setFont(font)
-                    glow = QGraphicsDropShadowEffect()
-                    glow.setBlurRadius(20)
-                    glow.setColor(QColor(255, 255, 255, 200))
-                    glow.setOffset(0, 0)
-                    label.setGraphicsEffect(glow)
-                elif self.maze[row][col] == 3:
-                    label.setStyleSheet("background-color: #0d0d0d; color: #4fc3f7; border: 1px solid #4682b4;")
-                    label.setText("💖")
-                    label.setFont(font)
-                    glow = QGraphicsDropShadowEffect()
-                    glow.setBlurRadius(20)
-                    glow.setColor(QColor(255, 255, 255, 180))
-                    glow.setOffset(0, 0)
-                    label.setGraphicsEffect(glow)
+                value = self.maze[row][col]
+                # Only cells whose content changed get restyled
+                if label.property("mazeValue") == value:
+                    continue
+                label.setProperty("mazeValue", value)
+                label.setProperty("cell", self.cell_roles[value])
+                if value in self.cell_text:
+                    label.setPixmap(emoji_atlas.pixmap(self.cell_text[value], self.emoji_size, label.devicePixelRatioF()))
+                    apply_glow(label, 20, QColor(255, 255, 255, 200 if value == 2 else 180))
+                else:
+                    label.clear()
+                    clear_glow(label)
+                refresh_style(label)
 
     def keyPressEvent(self, event):
         row, col = self.player_pos
@@ -1130,14 +2686,16 @@ class GamesTab(QWidget):
                 self.show_win_dialog()
 
     def show_win_dialog(self):
+        record_event("dialog", "You Found My Heart")
         dialog = QDialog(self)
+        # Without this every win leaves a dialog, its sunflower and its timer parented to the tab
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
         dialog.setWindowTitle("You Found My Heart! 💖")
-        dialog.setStyleSheet("background-color: #0d0d0d;")
+        set_role(dialog, "dark")
         dialog.setFixedSize(400, 400)
 
         layout = QVBoxLayout(dialog)
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
+        font = ui_font(14, italic=True)
 
         messages = [
             "You found my heart through the maze of life! 💕",
@@ -1146,22 +2704,18 @@ class GamesTab(QWidget):
             "You reached my heart, now it’s yours forever! 💖"
         ]
         message_label = QLabel(random.choice(messages))
-        message_label.setStyleSheet("color: #4fc3f7; font-size: 14px;")
+        set_role(message_label, "text", 14)
         message_label.setFont(font)
         message_label.setAlignment(Qt.AlignCenter)
         message_label.setWordWrap(True)
 
-        glow_message = QGraphicsDropShadowEffect()
-        glow_message.setBlurRadius(20)
-        glow_message.setColor(QColor(255, 255, 255, 180))
-        glow_message.setOffset(0, 0)
-        message_label.setGraphicsEffect(glow_message)
+        apply_glow(message_label, 20, QColor(255, 255, 255, 180))
 
         sunflower_widget = SunflowerWidget()
         sunflower_widget.setFixedSize(300, 300)
 
         close_button = QPushButton("Close")
-        close_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 12px; font-weight: bold;")
+        set_role(close_button, "accent", 12, bold=True)
         close_button.setFont(font)
         close_button.clicked.connect(dialog.accept)
 
@@ -1177,11 +2731,22 @@ class SunflowerWidget(QWidget):
         super().__init__(parent)
         self.progress = 0
         self.draw_stage = 0
-        self.setStyleSheet("background-color: #0d0d0d;")
+        set_role(self, "dark")
 
-        self.draw_timer = QTimer(self)
+        self.draw_timer = clock.timer(self)
         self.draw_timer.timeout.connect(self.update_drawing)
         self.draw_timer.start(50)
+        profile_widget(self, "sunflower")
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Pick up where a hide left off until the flower is finished
+        if self.draw_stage < 3 and not self.draw_timer.isActive():
+            self.draw_timer.start(50)
+
+    def hideEvent(self, event):
+        self.draw_timer.stop()
+        super().hideEvent(event)
 
     def update_drawing(self):
         if self.draw_stage >= 3:
@@ -1257,41 +2822,56 @@ class SunflowerWidget(QWidget):
 
 # CakeWidget Class
 class CakeWidget(QWidget):
+    colors = {
+        "chocolate": ("#8B4513", "#5C4033", "#3F2A1D"),
+        "strawberry": ("#FFB6C1", "#FF9999", "#FF6666"),
+        "vanilla": ("#FFF8DC", "#FFF5E1", "#FFF0DB")
+    }
+
     def __init__(self, cake_type, parent=None):
         super().__init__(parent)
-        self.cake_type = cake_type
         self.setFixedSize(400, 300)
 
-        self.colors = {
-            "chocolate": ("#8B4513", "#5C4033", "#3F2A1D"),
-            "strawberry": ("#FFB6C1", "#FF9999", "#FF6666"),
-            "vanilla": ("#FFF8DC", "#FFF5E1", "#FFF0DB")
-        }
-        self.layer_colors = self.colors.get(cake_type, ("#FFF8DC", "#FFF5E1", "#FFF0DB"))
-
-        self.draw_stage = 0
-        self.progress = 0
-
-        self.draw_timer = QTimer(self)
+        self.draw_timer = clock.timer(self)
         self.draw_timer.timeout.connect(self.update_drawing)
-        self.draw_timer.start(50)
-
-        self.countdown_active = False
-        self.countdown_seconds = 5
-        self.show_flames = True
 
         self.countdown_label = QLabel("", self)
-        self.countdown_label.setStyleSheet("color: #4fc3f7; font-size: 20px; font-weight: bold; background-color: transparent;")
-        font = QFont("Georgia", 20)
-        font.setItalic(True)
+        set_role(self.countdown_label, "text", 20, bold=True)
+        font = ui_font(20, italic=True)
         self.countdown_label.setFont(font)
         self.countdown_label.setAlignment(Qt.AlignCenter)
         self.countdown_label.setGeometry(0, 10, 400, 50)
-        self.countdown_label.hide()
 
-        self.countdown_timer = QTimer(self)
+        self.countdown_timer = clock.timer(self)
         self.countdown_timer.timeout.connect(self.update_countdown)
 
+        # Owned single-shot timer so a pending hide can be cancelled on reset
+        self.hide_label_timer = clock.timer(self)
+        self.hide_label_timer.setSingleShot(True)
+        self.hide_label_timer.timeout.connect(self.countdown_label.hide)
+        profile_widget(self, "cake")
+
+        self.configure(cake_type)
+
+    def configure(self, cake_type):
+        """Reset the animation in place for a (possibly different) flavor."""
+        self.draw_timer.stop()
+        self.countdown_timer.stop()
+        self.hide_label_timer.stop()
+
+        self.cake_type = cake_type
+        self.layer_colors = self.colors.get(cake_type, self.colors["vanilla"])
+
+        self.draw_stage = 0
+        self.progress = 0
+        self.countdown_active = False
+        self.countdown_seconds = 5
+        self.show_flames = True
+        self.countdown_label.hide()
+
+        self.draw_timer.start(50)
+        self.update()
+
     def update_drawing(self):
         if self.draw_stage >= 5:
             self.draw_timer.stop()
@@ -1321,7 +2901,7 @@ class CakeWidget(QWidget):
             self.countdown_active = False
             self.show_flames = False
             self.countdown_label.setText("Wish Made! 💖")
-            QTimer.singleShot(2000, self.countdown_label.hide)
+            self.hide_label_timer.start(2000)
             self.update()
 
     def paintEvent(self, event):
@@ -1362,12 +2942,11 @@ class CakeWidget(QWidget):
                         painter.drawEllipse(x + 2, base_y - layer_heights[0] - layer_heights[1] - layer_heights[2] - int(height) - 10, 6, 10)
 
         if self.draw_stage >= 4:
-            painter.setFont(QFont("Georgia", 12))
-            painter.setPen(QColor("#FFD700"))
             sparkle_positions = [(base_x + 40, base_y - 150), (base_x + 100, base_y - 150), (base_x + 160, base_y - 150)]
             for i, (x, y) in enumerate(sparkle_positions):
                 if i * 33 < self.progress or self.draw_stage > 4:
-                    painter.drawText(x, y, "✨")
+                    # (x, y) was the text baseline; the sparkle sits just above it
+                    draw_emoji(painter, QRectF(x, y - 16, 16, 16), "✨")
 
         painter.end()
 
@@ -1375,27 +2954,22 @@ class CakeWidget(QWidget):
 class CakeTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent;")
+        set_role(self, "page")
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 40, 20, 40)
         main_layout.setSpacing(10)
 
         self.instruction_label = QLabel("🎂 Choose a Birthday Cake, My Love! 🎂")
-        self.instruction_label.setStyleSheet("color: #4fc3f7; font-size: 22px; font-weight: bold;")
-        font = QFont("Georgia", 22)
-        font.setItalic(True)
+        set_role(self.instruction_label, "text", 22, bold=True)
+        font = ui_font(22, italic=True)
         self.instruction_label.setFont(font)
         self.instruction_label.setAlignment(Qt.AlignCenter)
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(30)
-        glow.setColor(QColor(255, 255, 255, 180))
-        glow.setOffset(0, 0)
-        self.instruction_label.setGraphicsEffect(glow)
+        apply_glow(self.instruction_label, 30, QColor(255, 255, 255, 180))
         main_layout.addWidget(self.instruction_label)
 
         self.cake_container = QWidget()
         self.cake_container.setFixedSize(400, 300)
-        self.cake_container.setStyleSheet("background-color: #0d0d0d; border: 2px solid #4682b4; border-radius: 10px;")
+        set_role(self.cake_container, "panel")
         self.cake_layout = QVBoxLayout(self.cake_container)
         self.cake_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.addWidget(self.cake_container, alignment=Qt.AlignCenter)
@@ -1414,8 +2988,8 @@ class CakeTab(QWidget):
 
         for cake_name, cake_type in cake_options:
             btn = QPushButton(cake_name)
-            btn.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px; font-weight: bold; padding: 8px;")
-            btn.setFont(QFont("Georgia", 14))
+            set_role(btn, "accent", 14, bold=True, padded=True)
+            btn.setFont(ui_font(14))
             btn.clicked.connect(lambda checked, ct=cake_type: self.display_cake(ct))
             self.cake_buttons.append(btn)
             control_layout.addWidget(btn)
@@ -1423,52 +2997,91 @@ class CakeTab(QWidget):
         main_layout.addLayout(control_layout)
 
         self.message_label = QLabel("")
-        self.message_label.setStyleSheet("color: #4fc3f7; font-size: 18px;")
-        self.message_label.setFont(QFont("Georgia", 18, QFont.Weight.Bold))
+        set_role(self.message_label, "text", 18)
+        self.message_label.setFont(ui_font(18, bold=True))
         self.message_label.setAlignment(Qt.AlignCenter)
         main_layout.addWidget(self.message_label)
 
     def display_cake(self, cake_type):
-        if self.current_cake_widget:
-            self.cake_layout.removeWidget(self.current_cake_widget)
-            self.current_cake_widget.deleteLater()
-
-        self.current_cake_widget = CakeWidget(cake_type)
-        self.cake_layout.addWidget(self.current_cake_widget)
+        # A single cake widget is created on first use and reconfigured in place afterwards
+        if self.current_cake_widget is None:
+            self.current_cake_widget = CakeWidget(cake_type)
+            self.cake_layout.addWidget(self.current_cake_widget)
+        else:
+            self.current_cake_widget.configure(cake_type)
 
         self.instruction_label.setText(f"🎂 Watch Your {cake_type.capitalize()} Cake Being Drawn, Love! 🎂")
         self.message_label.setText("Happy Birthday, My Sunflower! 🎉💖")
 
+# QualitiesModel Class
+class QualitiesModel(QAbstractListModel):
+    DescriptionRole = Qt.UserRole + 1
+
+    def __init__(self, qualities, parent=None):
+        super().__init__(parent)
+        self.qualities = qualities
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.qualities)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.qualities):
+            return None
+        quality = self.qualities[index.row()]
+        if role == Qt.DisplayRole:
+            return quality["name"]
+        if role == self.DescriptionRole:
+            return quality["desc"]
+        return None
+
+# QualityDelegate Class
+class QualityDelegate(QStyledItemDelegate):
+    cell_size = QSize(170, 56)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.font = ui_font(12, italic=True)
+        self.border_pen = QPen(QColor("#4682b4"), 2)
+        self.normal_brush = QBrush(QColor("#0d0d0d"))
+        self.hover_brush = QBrush(QColor("#4682b4"))
+        self.normal_text = QColor("#4fc3f7")
+        self.hover_text = QColor("#0d0d0d")
+
+    def sizeHint(self, option, index):
+        return self.cell_size
+
+    def paint(self, painter, option, index):
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        rect = option.rect.adjusted(1, 1, -1, -1)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self.border_pen)
+        painter.setBrush(self.hover_brush if hovered else self.normal_brush)
+        painter.drawRoundedRect(rect, 10, 10)
+
+        painter.setFont(self.font)
+        painter.setPen(self.hover_text if hovered else self.normal_text)
+        painter.drawText(rect.adjusted(5, 5, -5, -5), Qt.AlignCenter | Qt.TextWordWrap, index.data(Qt.DisplayRole))
+        painter.restore()
+
 # QualitiesTab Class
 class QualitiesTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.setStyleSheet("background-color: transparent;")
+        set_role(self, "page")
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 20, 20, 20)
         main_layout.setSpacing(10)
 
         title_label = QLabel("💖 100 Things I Love About You 💖")
-        title_label.setStyleSheet("color: #4fc3f7; font-size: 24px; font-weight: bold;")
-        font = QFont("Georgia", 24)
-        font.setItalic(True)
+        set_role(title_label, "text", 24, bold=True)
+        font = ui_font(24, italic=True)
         title_label.setFont(font)
         title_label.setAlignment(Qt.AlignCenter)
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(30)
-        glow.setColor(QColor(255, 255, 255, 180))
-        glow.setOffset(0, 0)
-        title_label.setGraphicsEffect(glow)
+        apply_glow(title_label, 30, QColor(255, 255, 255, 180))
         main_layout.addWidget(title_label)
 
-        scroll_area = QScrollArea()
-        scroll_area.setStyleSheet("background-color: transparent; border: none;")
-        scroll_area.setWidgetResizable(True)
-
-        scroll_widget = QWidget()
-        grid_layout = QGridLayout(scroll_widget)
-        grid_layout.setSpacing(10)
-
         self.qualities = [
     # Jake Peralta-inspired qualities (1-50)
     {"name": "Your Loving Gaze", "desc": "Your eyes hit me like a ‘Noice!’ from across the precinct, my Amy. They’re warmer than a Brooklyn coffee shop in winter, making me feel like John McClane saving the day. It’s not just a look—it’s a full-on heist of my heart, like I’m storming Nakatomi Plaza to win you over. I could stare into those eyes forever, and I’d never want a different case. You make every moment epic, like the best *Die Hard* scene, and I’m so lucky you’re my partner."},
@@ -1570,63 +3183,26 @@ class QualitiesTab(QWidget):
     {"name": "Your Loving Words", "desc": "Your words, Covey, are like love letters I want to read forever. Every ‘I love you’ or sweet text makes my heart skip, babe, better than a lacrosse goal. You’re my Lara Jean, speaking love into my life, my girl. I love how your words wrap me in warmth, and I’m so lucky to have you as my partner, writing our rom-com with every beautiful thing you say."},
     {"name": "You’re My Everything", "desc": "You’re my everything, Covey, like the heart of every letter I’d write for you. You make every day a rom-com win, babe, better than any game or movie. You’re my Lara Jean, my girl, stealing my heart with every moment. I love how you fill my world, and I’m so lucky to have you as my partner, living this love story together, forever and always, no doubt."}
 ]
-        font_btn = QFont("Georgia", 12)
-        font_btn.setItalic(True)
-        for idx, quality in enumerate(self.qualities):
-            button = QPushButton(quality["name"])
-            button.setStyleSheet("""
-                QPushButton {
-                    background-color: #0d0d0d;
-                    color: #4fc3f7;
-                    border: 2px solid #4682b4;
-                    border-radius: 10px;
-                    padding: 5px;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #4682b4;
-                    color: #0d0d0d;
-                }
-            """)
-            button.setFont(font_btn)
-            button.clicked.connect(lambda checked, q=quality: self.show_quality_dialog(q))
-            row = idx // 10
-            col = idx % 10
-            grid_layout.addWidget(button, row, col)
-
-        scroll_widget.setLayout(grid_layout)
-        scroll_area.setWidget(scroll_widget)
-        main_layout.addWidget(scroll_area)
+        # Cells are painted by the delegate, so only the visible ones cost anything
+        self.qualities_model = QualitiesModel(self.qualities, self)
+        self.qualities_view = QListView()
+        self.qualities_view.setViewMode(QListView.IconMode)
+        self.qualities_view.setResizeMode(QListView.Adjust)
+        self.qualities_view.setMovement(QListView.Static)
+        self.qualities_view.setUniformItemSizes(True)
+        self.qualities_view.setLayoutMode(QListView.Batched)
+        self.qualities_view.setSpacing(5)
+        self.qualities_view.setSelectionMode(QListView.NoSelection)
+        self.qualities_view.setMouseTracking(True)
+        self.qualities_view.viewport().setAttribute(Qt.WA_Hover)
+        set_role(self.qualities_view, "grid")
+        self.qualities_view.setItemDelegate(QualityDelegate(self.qualities_view))
+        self.qualities_view.setModel(self.qualities_model)
+        self.qualities_view.clicked.connect(lambda index: self.show_quality_dialog(self.qualities[index.row()]))
+        main_layout.addWidget(self.qualities_view)
 
     def show_quality_dialog(self, quality):
-        dialog = QDialog(self)
-        dialog.setWindowTitle(quality["name"])
-        dialog.setStyleSheet("background-color: #0d0d0d;")
-        dialog.setFixedSize(300, 200)
-
-        layout = QVBoxLayout(dialog)
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
-
-        label = QLabel(quality["desc"])
-        label.setStyleSheet("color: #4fc3f7; font-size: 14px;")
-        label.setFont(font)
-        label.setAlignment(Qt.AlignCenter)
-        label.setWordWrap(True)
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(20)
-        glow.setColor(QColor(255, 255, 255, 180))
-        glow.setOffset(0, 0)
-        label.setGraphicsEffect(glow)
-        layout.addWidget(label)
-
-        close_button = QPushButton("Close")
-        close_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 12px; font-weight: bold;")
-        close_button.setFont(font)
-        close_button.clicked.connect(dialog.accept)
-        layout.addWidget(close_button, alignment=Qt.AlignCenter)
-
-        dialog.exec()
+        detail_panel_for(self).show_detail(quality["name"], quality["desc"], size=(420, 320), center_text=True)
 
 
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem, QPushButton, QHBoxLayout, QGraphicsDropShadowEffect
@@ -1652,55 +3228,628 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QUrl, QTimer, Signal
 from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
 
-def clean_song_name(file_name):
-    return os.path.splitext(file_name)[0]
+def scan_music(music_dir):
+    """List (name, path) for every .wav in music_dir, with the Lauv song first."""
+    wav_files = glob.glob(os.path.join(music_dir, "*.wav"))
+    tracks = []
+    lauv_file = "Lauv - I Like Me Better [Official Video] 4.wav"
+    lauv_path = os.path.join(music_dir, lauv_file)
+    if os.path.exists(lauv_path):
+        tracks.append(("Lauv - I Like Me Better", lauv_path))
+    for file_path in sorted(wav_files):
+        if os.path.basename(file_path) != lauv_file:
+            tracks.append((clean_song_name(os.path.basename(file_path)), file_path))
+    playlist_log.info("Found %d songs in %s", len(tracks), music_dir)
+    return tracks
+
+# PlaybackSession Class
+class PlaybackSession(QObject):
+    """The one playlist everything shares: a track table addressed by id, plus play order, position and queue."""
+    current_changed = Signal(int)
+    order_changed = Signal()
+    queue_changed = Signal()
+
+    # "uniform" is a plain Fisher-Yates shuffle, "avoid_recent" pushes recently heard
+    # tracks to the back of the new order, "weighted" favours tracks played less often
+    SHUFFLE_MODES = ("uniform", "avoid_recent", "weighted")
+    SHUFFLE_LABELS = {"uniform": "🔀 Shuffle", "avoid_recent": "🔀 Fresh First", "weighted": "🔀 Least Played"}
+    history_limit = 500
+    recent_window = 10
+
+    def __init__(self, tracks, parent=None):
+        super().__init__(parent)
+        self.names = [name for name, _ in tracks]
+        self.paths = [path for _, path in tracks]
+        # Play order is a permutation of track ids and slots its inverse, so
+        # position -> track and track -> position are both O(1) lookups
+        self.order = array("i", range(len(tracks)))
+        self.slots = array("i", range(len(tracks)))
+        self.position = 0
+        self.queue = []
+        self.history = deque(maxlen=self.history_limit)
+        self.play_counts = array("i", bytes(4 * len(tracks)))
+        self.shuffle_mode = "uniform"
+        self.shuffled = False
+
+    def __len__(self):
+        return len(self.names)
+
+    def track(self, track_id):
+        return self.names[track_id], self.paths[track_id]
+
+    def current_track(self):
+        return self.order[self.position] if self.names else -1
+
+    def current_name(self):
+        return self.names[self.current_track()] if self.names else "No Song"
+
+    def current_path(self):
+        return self.paths[self.current_track()] if self.names else None
+
+    def position_of(self, track_id):
+        return self.slots[track_id]
+
+    def upcoming(self, count):
+        """Track ids likely to play next: the play-next queue, then the play order."""
+        upcoming = self.queue[:count]
+        position = self.position
+        while len(upcoming) < min(count, len(self.order) - 1):
+            position = (position + 1) % len(self.order)
+            if self.order[position] not in upcoming:
+                upcoming.append(self.order[position])
+        return upcoming
+
+    def move_to(self, position, remember=True, played=False):
+        if remember:
+            self.history.append(self.current_track())
+        self.position = position
+        track_id = self.order[position]
+        # Only forward moves count as plays; stepping back or jumping around would skew the weighted shuffle
+        if played:
+            self.play_counts[track_id] += 1
+        self.current_changed.emit(track_id)
+
+    def set_current_track(self, track_id):
+        if 0 <= track_id < len(self.names):
+            self.move_to(self.slots[track_id])
+
+    def next(self):
+        if not self.names:
+            return
+        if self.queue:
+            track_id = self.queue.pop(0)
+            self.queue_changed.emit()
+            self.move_to(self.slots[track_id], played=True)
+        elif self.position + 1 < len(self.order):
+            self.move_to(self.position + 1, played=True)
+        elif self.shuffled:
+            # Start a fresh round rather than replaying the same shuffled order
+            self.history.append(self.current_track())
+            self.shuffle(keep_first=False)
+            self.move_to(0, remember=False, played=True)
+        else:
+            self.move_to(0, played=True)
 
-class HeartAnimationWidget(QWidget):
-    def __init__(self, parent=None):
+    def previous(self):
+        """Go back to the track that actually played before this one."""
+        if not self.names:
+            return
+        if self.history:
+            self.move_to(self.slots[self.history.pop()], remember=False)
+        else:
+            self.move_to((self.position - 1) % len(self.order), remember=False)
+
+    def enqueue(self, track_id):
+        if 0 <= track_id < len(self.names) and track_id not in self.queue:
+            self.queue.append(track_id)
+            self.queue_changed.emit()
+
+    def queue_position(self, track_id):
+        """1-based place in the play-next queue, or 0 when the track isn't queued."""
+        return self.queue.index(track_id) + 1 if track_id in self.queue else 0
+
+    def set_shuffle_mode(self, mode):
+        if mode not in self.SHUFFLE_MODES:
+            raise ValueError(f"Unknown shuffle mode: {mode}")
+        self.shuffle_mode = mode
+
+    def cycle_shuffle_mode(self):
+        """Switch to the next shuffle mode and reshuffle what's left with it."""
+        index = self.SHUFFLE_MODES.index(self.shuffle_mode)
+        self.set_shuffle_mode(self.SHUFFLE_MODES[(index + 1) % len(self.SHUFFLE_MODES)])
+        # Tracks up to and including the current one have been heard this round and stay put
+        self.shuffle(start=self.position + 1)
+        return self.shuffle_mode
+
+    def shuffle(self, keep_first=True, start=None):
+        """Shuffle order[start:] in place (the whole order, or all but the first track,
+        when start is None); the current track keeps playing."""
+        if start is None:
+            start = 1 if keep_first else 0
+        count = len(self.order)
+        if count - start < 2:
+            return
+        current = self.current_track()
+
+        if self.shuffle_mode == "weighted":
+            # Weighted random order (Efraimidis-Spirakis keys): weight 1 / (1 + plays)
+            keys = {track_id: random.random() ** (1 + self.play_counts[track_id]) for track_id in self.order[start:]}
+            self.order[start:] = array("i", sorted(self.order[start:], key=keys.get, reverse=True))
+        else:
+            for i in range(count - 1, start, -1):
+                j = random.randint(start, i)
+                self.order[i], self.order[j] = self.order[j], self.order[i]
+            if self.shuffle_mode == "avoid_recent":
+                recent = set(list(self.history)[-self.recent_window:])
+                recent.add(current)
+                upcoming = self.order[start:]
+                self.order[start:] = array("i", [t for t in upcoming if t not in recent] + [t for t in upcoming if t in recent])
+
+        # A new round should not open with the track that just finished
+        if start == 0 and self.order[0] == current:
+            swap = random.randint(1, count - 1)
+            self.order[0], self.order[swap] = self.order[swap], self.order[0]
+
+        for position, track_id in enumerate(self.order):
+            self.slots[track_id] = position
+        self.position = self.slots[current]
+        self.shuffled = True
+        self.order_changed.emit()
+
+# WaveformSignals Class
+class WaveformSignals(QObject):
+    ready = Signal(str, object)
+    failed = Signal(str, str)
+
+# WaveformTask Class
+class WaveformTask(QRunnable):
+    """Compute a track's waveform overview on a pool thread and store it in the library cache."""
+
+    def __init__(self, path, buckets):
+        super().__init__()
+        self.path = path
+        self.buckets = buckets
+        self.signals = WaveformSignals()
+
+    def run(self):
+        try:
+            peaks = compute_peaks(self.path, self.buckets)
+            if library is not None:
+                cache_path = library.cache_path(self.path, "waveforms", ".npy")
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                np.save(cache_path, peaks)
+            self.signals.ready.emit(self.path, peaks)
+        except Exception as e:
+            self.signals.failed.emit(self.path, str(e))
+
+# WaveformSeekBar Class
+class WaveformSeekBar(QWidget):
+    """Progress bar over the current track's waveform; click or drag to seek."""
+    buckets = 1024
+    memory_limit = 32
+
+    def __init__(self, player, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("background: transparent;")
+        self.player = player
+        self.track = None
+        self.peaks = None
+        self.position = 0
+        self.duration = 0
+        self.scrubbing = False
+        self.overview = None
+        self.played_overview = None
+        self.loaded = OrderedDict()
+        self.pending = {}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self.wave_color = QColor("#2a5d7a")
+        self.played_color = QColor("#4fc3f7")
+        self.head_pen = QPen(QColor("#ffffff"), 1)
+        self.setFixedHeight(36)
+        self.setCursor(Qt.PointingHandCursor)
+
+        self.player.positionChanged.connect(self.set_position)
+        self.player.durationChanged.connect(self.set_duration)
+
+    def load_track(self, path):
+        self.track = path
+        self.position = 0
+        peaks = self.loaded.get(path)
+        if peaks is None and path is not None and np is not None:
+            peaks = self.load_cached(path)
+            if peaks is None and path not in self.pending:
+                task = WaveformTask(path, self.buckets)
+                task.signals.ready.connect(self.handle_peaks)
+                task.signals.failed.connect(self.handle_failed)
+                self.pending[path] = task
+                self.pool.start(task)
+        self.set_peaks(peaks)
+
+    def load_cached(self, path):
+        if library is None or library.entry(path).get("waveform") != self.buckets:
+            return None
+        try:
+            peaks = np.load(library.cache_path(path, "waveforms", ".npy"))
+        except (OSError, ValueError) as e:
+            media_log.warning("Could not load waveform for %s: %s", path, e)
+            return None
+        self.remember(path, peaks)
+        return peaks
+
+    def remember(self, path, peaks):
+        self.loaded[path] = peaks
+        self.loaded.move_to_end(path)
+        if len(self.loaded) > self.memory_limit:
+            self.loaded.popitem(last=False)
+
+    def handle_peaks(self, path, peaks):
+        self.pending.pop(path, None)
+        self.remember(path, peaks)
+        if library is not None:
+            library.update(path, waveform=self.buckets)
+        if path == self.track:
+            self.set_peaks(peaks)
+
+    def handle_failed(self, path, message):
+        self.pending.pop(path, None)
+        media_log.debug("No waveform for %s: %s", path, message)
+
+    def set_peaks(self, peaks):
+        self.peaks = peaks
+        self.render_overview()
+        self.update()
 
-class PasswordDialog(QDialog):
-    def __init__(self, player, audio_output, playlist, parent=None):
+    def render_overview(self):
+        # Drawn once per track and size; playback only moves the clip between the two copies
+        self.overview = self.played_overview = None
+        if self.peaks is None or self.width() <= 0:
+            return
+        width, height = self.width(), self.height()
+        edges = np.linspace(0, self.buckets, width + 1).astype(int)[:-1]
+        lows = np.minimum.reduceat(self.peaks[0], edges)
+        highs = np.maximum.reduceat(self.peaks[1], edges)
+        middle = height / 2
+        pixmaps = []
+        for color in (self.wave_color, self.played_color):
+            pixmap = QPixmap(self.size() * self.devicePixelRatioF())
+            pixmap.setDevicePixelRatio(self.devicePixelRatioF())
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setPen(color)
+            for x in range(width):
+                painter.drawLine(QPointF(x + 0.5, middle - highs[x] * middle), QPointF(x + 0.5, middle - lows[x] * middle))
+            painter.end()
+            pixmaps.append(pixmap)
+        self.overview, self.played_overview = pixmaps
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.render_overview()
+
+    def playhead_x(self):
+        return round(self.width() * self.position / self.duration) if self.duration else 0
+
+    def set_position(self, position):
+        if self.scrubbing:
+            return
+        old_x = self.playhead_x()
+        self.position = position
+        if self.playhead_x() != old_x:
+            self.update()
+
+    def set_duration(self, duration):
+        self.duration = duration
+        self.update()
+
+    def seek_to(self, x):
+        if self.duration:
+            self.position = int(self.duration * min(max(x / self.width(), 0.0), 1.0))
+            self.update()
+
+    def mousePressEvent(self, event):
+        self.scrubbing = True
+        self.seek_to(event.position().x())
+
+    def mouseMoveEvent(self, event):
+        if self.scrubbing:
+            self.seek_to(event.position().x())
+
+    def mouseReleaseEvent(self, event):
+        if self.scrubbing:
+            self.scrubbing = False
+            self.seek_to(event.position().x())
+            self.player.setPosition(self.position)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        played = self.playhead_x()
+        if self.overview is not None:
+            painter.drawPixmap(0, 0, self.overview)
+            painter.setClipRect(0, 0, played, self.height())
+            painter.drawPixmap(0, 0, self.played_overview)
+            painter.setClipping(False)
+        else:
+            middle = self.height() // 2
+            painter.fillRect(0, middle - 1, self.width(), 3, self.wave_color)
+            painter.fillRect(0, middle - 1, played, 3, self.played_color)
+        painter.setPen(self.head_pen)
+        painter.drawLine(played, 0, played, self.height())
+
+# AudioTap Class
+class AudioTap(QObject):
+    """Copy decoded audio into a ring buffer and turn it into spectrum frames on a worker thread.
+
+    Every array is allocated up front: buffers from the player are averaged down to mono in a
+    scratch array and copied into the ring, and each analysis frame reuses the same window,
+    FFT output and band arrays.
+    """
+    ring_size = 1 << 15
+    fft_size = 2048
+    band_count = 24
+    wave_points = 128
+    frame_interval = 1 / 60
+    cpu_budget = 0.004
+    decay = 0.85
+
+    def __init__(self, player, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Enter Password")
-        layout = QVBoxLayout(self)
-        label = QLabel("Password protection is not implemented yet.")
-        layout.addWidget(label)
-        button = QPushButton("OK")
-        button.clicked.connect(self.accept)
-        layout.addWidget(button)
+        self.player = player
+        self.lock = threading.Lock()
+        self.ring = np.zeros(self.ring_size, dtype=np.float32)
+        self.mix = np.zeros(self.ring_size, dtype=np.float32)
+        self.written = 0
+        self.sample_rate = 44100
+
+        self.frame = np.zeros(self.fft_size, dtype=np.float32)
+        self.window = np.hanning(self.fft_size).astype(np.float32)
+        self.spectrum = np.zeros(self.fft_size // 2 + 1, dtype=np.complex64)
+        self.magnitudes = np.zeros(self.fft_size // 2 + 1, dtype=np.float32)
+        self.band_matrix = self.make_band_matrix()
+        self.bands = np.zeros(self.band_count, dtype=np.float32)
+        # Levels and waveform are double buffered; the flip and snapshot() share frame_lock,
+        # so the worker never starts on the buffer the GUI is still copying
+        self.frame_lock = threading.Lock()
+        self.levels = [np.zeros(self.band_count, dtype=np.float32) for _ in range(2)]
+        self.waves = [np.zeros(self.wave_points, dtype=np.float32) for _ in range(2)]
+        self.front = 0
+        self.frame_id = 0
+        self.skipped = 0
+
+        self.output = QAudioBufferOutput(self)
+        self.output.audioBufferReceived.connect(self.receive_buffer)
+        player.setAudioBufferOutput(self.output)
+
+        self.running = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="AudioTap", daemon=True)
+        self.thread.start()
+
+    def make_band_matrix(self):
+        # Log-spaced bands from 40 Hz up, each averaging its FFT bins with one matrix product
+        bins = self.fft_size // 2 + 1
+        edges = np.geomspace(40, 16000, self.band_count + 1) * self.fft_size / self.sample_rate
+        matrix = np.zeros((self.band_count, bins), dtype=np.float32)
+        for band in range(self.band_count):
+            low = min(int(edges[band]), bins - 1)
+            high = max(low + 1, min(int(edges[band + 1]), bins))
+            matrix[band, low:high] = 1.0 / (high - low)
+        return matrix
+
+    def receive_buffer(self, buffer):
+        try:
+            audio_format = buffer.format()
+            # UInt8 is offset binary: silence is 0x80
+            dtype, offset, scale = {
+                QAudioFormat.SampleFormat.UInt8: (np.uint8, 128, 1 / 128),
+                QAudioFormat.SampleFormat.Int16: (np.int16, 0, 1 / 32768),
+                QAudioFormat.SampleFormat.Int32: (np.int32, 0, 1 / 2147483648),
+                QAudioFormat.SampleFormat.Float: (np.float32, 0, 1.0),
+            }.get(audio_format.sampleFormat(), (None, 0, 0))
+            if dtype is None:
+                return
+            if audio_format.sampleRate() != self.sample_rate:
+                self.sample_rate = audio_format.sampleRate()
+                self.band_matrix = self.make_band_matrix()
+            # Viewed in place as frames x channels, then averaged into the mono scratch array
+            channels = max(1, audio_format.channelCount())
+            samples = np.frombuffer(buffer.constData(), dtype=dtype)
+            frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)[-self.ring_size:]
+            mix = self.mix[:len(frames)]
+            np.mean(frames, axis=1, dtype=np.float32, out=mix)
+            if offset:
+                np.subtract(mix, offset, out=mix)
+            self.write(mix, scale)
+        except Exception:
+            media_log.exception("Error in receive_buffer")
+
+    def write(self, samples, scale):
+        with self.lock:
+            start = self.written % self.ring_size
+            first = min(len(samples), self.ring_size - start)
+            np.multiply(samples[:first], scale, out=self.ring[start:start + first], casting="unsafe")
+            np.multiply(samples[first:], scale, out=self.ring[:len(samples) - first], casting="unsafe")
+            self.written += len(samples)
+        self.running.set()
+
+    def latest(self):
+        """Copy the newest fft_size samples out of the ring into self.frame."""
+        with self.lock:
+            end = self.written % self.ring_size
+            start = end - self.fft_size
+            if start >= 0:
+                self.frame[:] = self.ring[start:end]
+            else:
+                self.frame[:-start] = self.ring[start:]
+                self.frame[-start:] = self.ring[:end]
 
-class PlaylistWidget(QWidget):
-    current_song_changed = Signal(int)
+    def analyse(self):
+        back = 1 - self.front
+        levels = self.levels[back]
+        np.multiply(self.frame, self.window, out=self.frame)
+        try:
+            np.fft.rfft(self.frame, out=self.spectrum)
+        except TypeError:
+            # NumPy 1.x has no out= for FFTs
+            self.spectrum[:] = np.fft.rfft(self.frame)
+        np.abs(self.spectrum, out=self.magnitudes)
+        np.dot(self.band_matrix, self.magnitudes, out=self.bands)
+        np.add(self.bands, 1e-6, out=self.bands)
+        np.log10(self.bands, out=self.bands)
+        # Roughly -60..+20 dB mapped to 0..1, then falling off smoothly instead of flickering
+        np.multiply(self.bands, 1 / 4, out=self.bands)
+        np.add(self.bands, 0.75, out=self.bands)
+        np.clip(self.bands, 0.0, 1.0, out=self.bands)
+        np.multiply(self.levels[self.front], self.decay, out=levels)
+        np.maximum(levels, self.bands, out=levels)
+
+        wave = self.waves[back]
+        self.latest()
+        np.copyto(wave, self.frame[-self.wave_points * 4::4])
+        with self.frame_lock:
+            self.front = back
+            self.frame_id += 1
+
+    def run(self):
+        stride = 1
+        tick = 0
+        seen = 0
+        while not self.stopping.is_set():
+            self.running.wait()
+            time.sleep(self.frame_interval)
+            tick += 1
+            if self.written == seen:
+                # Nothing new arrived, so go idle until the next buffer
+                self.running.clear()
+                continue
+            if tick % stride:
+                self.skipped += 1
+                continue
+            seen = self.written
+            started = time.perf_counter()
+            self.latest()
+            self.analyse()
+            # Analyse fewer frames on a loaded machine rather than fall behind the audio
+            elapsed = time.perf_counter() - started
+            if elapsed > self.cpu_budget:
+                stride = min(stride + 1, 6)
+            elif stride > 1 and elapsed < self.cpu_budget / 2:
+                stride -= 1
+
+    def snapshot(self, levels, wave):
+        """Copy the newest published frame into the caller's arrays and return its id."""
+        with self.frame_lock:
+            np.copyto(levels, self.levels[self.front])
+            np.copyto(wave, self.waves[self.front])
+            return self.frame_id
+
+    def close(self):
+        """Stop the worker thread, detach from the player unless another tap has taken over, and delete the tap."""
+        self.stopping.set()
+        self.running.set()
+        # Let the worker finish its current frame before the arrays and output go away
+        self.thread.join(timeout=1)
+        if self.player.audioBufferOutput() is self.output:
+            self.player.setAudioBufferOutput(None)
+        self.deleteLater()
+
+# VisualizerWidget Class
+class VisualizerWidget(QWidget):
+    """Spectrum bars or a waveform drawn from an AudioTap at up to 60 fps; click to switch."""
+
+    def __init__(self, player, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(80)
+        self.mode = "bars"
+        self.bar_color = QColor("#4fc3f7")
+        self.wave_pen = QPen(QColor("#4fc3f7"), 1.5)
+        self.tap = None
+        if np is None or QAudioBufferOutput is None:
+            self.setToolTip("Install numpy for the music visualizer")
+            return
+
+        # The tap has no parent so it is still alive when the widget's destroyed signal fires
+        self.tap = AudioTap(player)
+        self.destroyed.connect(self.tap.close)
+        self.levels = np.zeros(AudioTap.band_count, dtype=np.float32)
+        self.wave = np.zeros(AudioTap.wave_points, dtype=np.float32)
+        self.frame_id = 0
+        self.timer = clock.timer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(16)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.tap is not None:
+            self.timer.start()
 
-    def __init__(self, player, playlist, parent=None):
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        if self.tap is not None:
+            self.timer.stop()
+
+    def mousePressEvent(self, event):
+        self.mode = "wave" if self.mode == "bars" else "bars"
+        self.update()
+
+    def refresh(self):
+        # Only repaint when the worker has published a new frame
+        frame_id = self.tap.snapshot(self.levels, self.wave)
+        if frame_id != self.frame_id:
+            self.frame_id = frame_id
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.tap is None:
+            draw_emoji(painter, self.rect(), "🎵", 24)
+            return
+        width, height = self.width(), self.height()
+        if self.mode == "bars":
+            bar_width = width / len(self.levels)
+            for i, level in enumerate(self.levels):
+                bar_height = level * height
+                painter.fillRect(QRectF(i * bar_width + 1, height - bar_height, bar_width - 2, bar_height), self.bar_color)
+        else:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(self.wave_pen)
+            middle = height / 2
+            step = width / (len(self.wave) - 1)
+            path = QPainterPath()
+            path.moveTo(0, middle - self.wave[0] * middle)
+            for i in range(1, len(self.wave)):
+                path.lineTo(i * step, middle - self.wave[i] * middle)
+            painter.drawPath(path)
+
+class PlaylistWidget(QWidget):
+    def __init__(self, player, session, parent=None):
         super().__init__(parent)
         self.player = player
-        self.original_playlist = playlist
-        self.playlist = list(playlist)
-        self.current_index = 0
+        self.session = session
         self.is_playing = True
         self.has_shuffled = False
-        self.play_next_queue = []
         self.setFixedWidth(200)
-        self.setStyleSheet("background-color: #0d0d0d; border-left: 2px solid #4682b4;")
+        self.setObjectName("playlistSidebar")
+        self.setAttribute(Qt.WA_StyledBackground)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
         self.song_label = QLabel(self.get_current_song_name())
-        self.song_label.setStyleSheet("color: #4fc3f7; font-size: 14px;")
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
+        set_role(self.song_label, "text", 14)
+        font = ui_font(14, italic=True)
         self.song_label.setFont(font)
         self.song_label.setAlignment(Qt.AlignCenter)
         self.song_label.setWordWrap(False)
         layout.addWidget(self.song_label)
 
+        self.seek_bar = WaveformSeekBar(self.player)
+        self.seek_bar.load_track(self.session.current_path())
+        layout.addWidget(self.seek_bar)
+
         self.scroll_offset = 0
-        self.scroll_timer = QTimer(self)
+        self.scroll_timer = clock.timer(self)
         self.scroll_timer.timeout.connect(self.update_scroll)
         self.scroll_timer.start(100)
 
@@ -1708,31 +3857,34 @@ class PlaylistWidget(QWidget):
         control_layout.setSpacing(5)
 
         self.prev_button = QPushButton("⏮")
-        self.prev_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 12px;")
+        set_role(self.prev_button, "accent", 12)
         self.prev_button.clicked.connect(self.play_previous)
         control_layout.addWidget(self.prev_button)
 
         self.play_pause_button = QPushButton("⏸")
-        self.play_pause_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 12px;")
+        set_role(self.play_pause_button, "accent", 12)
         self.play_pause_button.clicked.connect(self.toggle_play_pause)
         control_layout.addWidget(self.play_pause_button)
 
         self.next_button = QPushButton("⏭")
-        self.next_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 12px;")
+        set_role(self.next_button, "accent", 12)
         self.next_button.clicked.connect(self.play_next)
         control_layout.addWidget(self.next_button)
 
         layout.addLayout(control_layout)
+
+        self.visualizer = VisualizerWidget(self.player)
+        layout.addWidget(self.visualizer)
         layout.addStretch()
 
         self.player.mediaStatusChanged.connect(self.handle_media_status)
-        self.current_song_changed.connect(self.update_ui)
+        self.session.current_changed.connect(self.handle_current_changed)
 
     def get_current_song_name(self):
-        return self.playlist[self.current_index][0] if self.playlist else "No Song"
+        return self.session.current_name()
 
     def update_scroll(self):
-        if not self.playlist:
+        if not len(self.session):
             return
         song_name = self.get_current_song_name()
         metrics = self.song_label.fontMetrics()
@@ -1744,10 +3896,11 @@ class PlaylistWidget(QWidget):
             if self.scroll_offset > text_width + 50:
                 self.scroll_offset = -widget_width
             self.song_label.setText(song_name)
-            self.song_label.setStyleSheet(f"color: #4fc3f7; font-size: 14px; padding-left: {-self.scroll_offset}px;")
+            # Scroll with contents margins rather than re-parsing a stylesheet every tick
+            self.song_label.setContentsMargins(-self.scroll_offset, 0, 0, 0)
         else:
             self.scroll_offset = 0
-            self.song_label.setStyleSheet("color: #4fc3f7; font-size: 14px;")
+            self.song_label.setContentsMargins(0, 0, 0, 0)
             self.song_label.setText(song_name)
 
     def toggle_play_pause(self):
@@ -1760,146 +3913,92 @@ class PlaylistWidget(QWidget):
                 self.player.play()
                 self.play_pause_button.setText("⏸")
                 self.is_playing = True
-        except Exception as e:
-            print(f"Error in toggle_play_pause: {e}")
+        except Exception:
+            playlist_log.exception("Error in toggle_play_pause")
 
     def play_previous(self):
         try:
-            if self.current_index > 0:
-                self.current_index -= 1
-            else:
-                self.current_index = len(self.playlist) - 1
-            self.current_song_changed.emit(self.current_index)
-            self.play_current_song()
-        except Exception as e:
-            print(f"Error in play_previous: {e}")
+            record_event("skip", self.session.current_path(), "previous")
+            self.session.previous()
+        except Exception:
+            playlist_log.exception("Error in play_previous")
 
     def play_next(self):
         try:
-            if self.play_next_queue:
-                next_song = self.play_next_queue.pop(0)
-                for idx, (name, path) in enumerate(self.playlist):
-                    if name == next_song[0] and path == next_song[1]:
-                        self.current_index = idx
-                        break
-            else:
-                if self.current_index < len(self.playlist) - 1:
-                    self.current_index += 1
-                else:
-                    self.current_index = 0
-            self.current_song_changed.emit(self.current_index)
-            self.play_current_song()
-        except Exception as e:
-            print(f"Error in play_next: {e}")
+            record_event("skip", self.session.current_path(), "next")
+            self.session.next()
+        except Exception:
+            playlist_log.exception("Error in play_next")
+
+    def handle_current_changed(self, track_id):
+        self.update_ui()
+        self.seek_bar.load_track(self.session.current_path())
+        self.play_current_song()
 
     def play_current_song(self):
         try:
-            if not self.playlist or self.current_index >= len(self.playlist):
-                print("No songs in playlist or invalid index")
+            audio_path = self.session.current_path()
+            if audio_path is None:
+                playlist_log.info("No songs in playlist")
                 return
-            audio_path = self.playlist[self.current_index][1]
             if os.path.exists(audio_path):
                 self.player.stop()
+                apply_track_gain(self.player.audioOutput(), audio_path)
                 self.player.setSource(QUrl.fromLocalFile(audio_path))
                 if self.player.isAvailable():
                     self.player.play()
                     self.play_pause_button.setText("⏸")
                     self.is_playing = True
+                    record_event("play", audio_path, self.session.current_name())
                 else:
-                    print(f"Error: Media player not available for {audio_path}")
+                    media_log.error("Media player not available for %s", audio_path)
             else:
-                print(f"Error: Song file not found: {audio_path}")
-        except Exception as e:
-            print(f"Error in play_current_song: {e}")
-
-    def set_current_index(self, index):
-        try:
-            if 0 <= index < len(self.playlist):
-                self.current_index = index
-                self.current_song_changed.emit(self.current_index)
-                self.play_current_song()
-        except Exception as e:
-            print(f"Error in set_current_index: {e}")
-
-    def add_to_play_next(self, song):
-        try:
-            if song not in self.play_next_queue:
-                self.play_next_queue.append(song)
-        except Exception as e:
-            print(f"Error in add_to_play_next: {e}")
-
-    def shuffle_playlist(self):
-        try:
-            if len(self.playlist) > 1:
-                lauv = self.playlist[0]
-                rest = self.playlist[1:]
-                random.shuffle(rest)
-                self.playlist = [lauv] + rest
-                if self.current_index > 0:
-                    for idx, song in enumerate(self.playlist):
-                        if song == self.original_playlist[self.current_index]:
-                            self.current_index = idx
-                            break
-        except Exception as e:
-            print(f"Error in shuffle_playlist: {e}")
+                playlist_log.warning("Song file not found: %s", audio_path)
+        except Exception:
+            playlist_log.exception("Error in play_current_song")
 
     def update_ui(self):
         try:
             self.song_label.setText(self.get_current_song_name())
             self.scroll_offset = 0
             self.update_scroll()
-        except Exception as e:
-            print(f"Error in update_ui: {e}")
+        except Exception:
+            playlist_log.exception("Error in update_ui")
 
     def handle_media_status(self, status):
         try:
             if status == QMediaPlayer.MediaStatus.EndOfMedia:
-                if self.current_index == 0 and not self.has_shuffled and self.playlist[0][0] == "Lauv - I Like Me Better":
-                    self.shuffle_playlist()
+                record_event("complete", self.session.current_path(), self.session.current_name())
+                if self.session.position == 0 and not self.has_shuffled and self.session.current_name() == "Lauv - I Like Me Better":
+                    self.session.shuffle(keep_first=True)
                     self.has_shuffled = True
-                self.play_next()
-        except Exception as e:
-            print(f"Error in handle_media_status: {e}")
+                self.session.next()
+        except Exception:
+            playlist_log.exception("Error in handle_media_status")
 
 class PlaylistTab(QWidget):
-    def __init__(self, player, playlist, playlist_widget, parent=None):
+    def __init__(self, player, session, playlist_widget, parent=None):
         super().__init__(parent)
         self.player = player
-        self.playlist = playlist
+        self.session = session
         self.playlist_widget = playlist_widget
-        self.setStyleSheet("background-color: #0d0d0d;")
+        set_role(self, "dark")
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(40, 40, 40, 40)
         layout.setSpacing(20)
 
         title_label = QLabel("🎵 Your LoveBox Playlist 🎵")
-        title_label.setStyleSheet("color: #4fc3f7; font-size: 24px; font-weight: bold;")
-        font = QFont("Georgia", 24)
-        font.setItalic(True)
+        set_role(title_label, "text", 24, bold=True)
+        font = ui_font(24, italic=True)
         title_label.setFont(font)
         title_label.setAlignment(Qt.AlignCenter)
-        glow = QGraphicsDropShadowEffect()
-        glow.setBlurRadius(30)
-        glow.setColor(QColor(255, 255, 255, 180))
-        glow.setOffset(0, 0)
-        title_label.setGraphicsEffect(glow)
+        apply_glow(title_label, 30, QColor(255, 255, 255, 180))
         layout.addWidget(title_label)
 
         self.song_list = QListWidget()
-        self.song_list.setStyleSheet("""
-            QListWidget {
-                background-color: #0d0d0d;
-                color: #4fc3f7;
-                border: 2px solid #4682b4;
-                font-size: 16px;
-            }
-            QListWidget::item:selected {
-                background-color: #4682b4;
-                color: #0d0d0d;
-            }
-        """)
-        self.song_list.setFont(QFont("Georgia", 16))
+        set_role(self.song_list, "songs", 16)
+        self.song_list.setFont(ui_font(16))
         self.update_song_list()
         self.song_list.itemClicked.connect(self.play_selected_song)
         layout.addWidget(self.song_list)
@@ -1908,140 +4007,312 @@ class PlaylistTab(QWidget):
         control_layout.setSpacing(10)
 
         prev_button = QPushButton("⏮ Previous")
-        prev_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        prev_button.setFont(QFont("Georgia", 14))
+        set_role(prev_button, "accent", 14)
+        prev_button.setFont(ui_font(14))
         prev_button.clicked.connect(self.playlist_widget.play_previous)
         control_layout.addWidget(prev_button)
 
         self.play_pause_button = QPushButton("⏸ Pause")
-        self.play_pause_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        self.play_pause_button.setFont(QFont("Georgia", 14))
+        set_role(self.play_pause_button, "accent", 14)
+        self.play_pause_button.setFont(ui_font(14))
         self.play_pause_button.clicked.connect(self.toggle_play_pause)
         control_layout.addWidget(self.play_pause_button)
 
         next_button = QPushButton("Next ⏭")
-        next_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        next_button.setFont(QFont("Georgia", 14))
+        set_role(next_button, "accent", 14)
+        next_button.setFont(ui_font(14))
         next_button.clicked.connect(self.playlist_widget.play_next)
         control_layout.addWidget(next_button)
 
         play_next_button = QPushButton("Play Next ⏩")
-        play_next_button.setStyleSheet("background-color: #4682b4; color: #0d0d0d; font-size: 14px;")
-        play_next_button.setFont(QFont("Georgia", 14))
+        set_role(play_next_button, "accent", 14)
+        play_next_button.setFont(ui_font(14))
         play_next_button.clicked.connect(self.add_to_play_next)
         control_layout.addWidget(play_next_button)
 
+        self.shuffle_button = QPushButton(PlaybackSession.SHUFFLE_LABELS[self.session.shuffle_mode])
+        set_role(self.shuffle_button, "accent", 14)
+        self.shuffle_button.setFont(ui_font(14))
+        self.shuffle_button.clicked.connect(self.cycle_shuffle_mode)
+        control_layout.addWidget(self.shuffle_button)
+
         layout.addLayout(control_layout)
 
-        self.playlist_widget.current_song_changed.connect(self.update_song_list_selection)
+        self.session.current_changed.connect(self.update_song_list_selection)
+        self.session.queue_changed.connect(self.update_song_list)
 
     def update_song_list(self):
         try:
             self.song_list.clear()
-            for idx, (song_name, path) in enumerate(self.playlist):
+            missing = 0
+            # Rows follow the track table, so a row's track id never changes with shuffles
+            for track_id in range(len(self.session)):
+                song_name, path = self.session.track(track_id)
                 if not os.path.exists(path):
-                    print(f"Warning: Song path does not exist: {path}")
+                    missing += 1
                     continue
                 display_name = song_name
-                if (song_name, path) in self.playlist_widget.play_next_queue:
-                    queue_pos = self.playlist_widget.play_next_queue.index((song_name, path)) + 1
+                queue_pos = self.session.queue_position(track_id)
+                if queue_pos:
                     display_name = f"{song_name} [Next #{queue_pos}]"
                 item = QListWidgetItem(display_name)
-                item.setData(Qt.UserRole, idx)
+                item.setData(Qt.UserRole, track_id)
                 self.song_list.addItem(item)
-        except Exception as e:
-            print(f"Error in update_song_list: {e}")
+            if missing:
+                playlist_log.warning("%d songs in the playlist are missing from disk", missing)
+        except Exception:
+            playlist_log.exception("Error in update_song_list")
 
     def play_selected_song(self, item):
         try:
-            idx = item.data(Qt.UserRole)
-            if idx is None or idx < 0 or idx >= len(self.playlist):
-                print(f"Invalid playlist index: {idx}")
+            track_id = item.data(Qt.UserRole)
+            if track_id is None or track_id < 0 or track_id >= len(self.session):
+                playlist_log.warning("Invalid playlist index: %s", track_id)
                 return
-            song_name, song_path = self.playlist[idx]
-            print(f"Attempting to play: {song_name} ({song_path})")
-            if not os.path.exists(song_path):
-                print(f"Error: Song file not found: {song_path}")
-                return
-            self.player.stop()
-            self.player.setSource(QUrl())
-            QTimer.singleShot(100, lambda: self._set_and_play(song_path, idx))
-        except Exception as e:
-            print(f"Error in play_selected_song: {e}")
-
-    def _set_and_play(self, song_path, idx):
+            song_name, song_path = self.session.track(track_id)
+            playlist_log.debug("Attempting to play: %s (%s)", song_name, song_path)
+            self.session.set_current_track(track_id)
+            self.play_pause_button.setText("⏸ Pause")
+        except Exception:
+            playlist_log.exception("Error in play_selected_song")
+
+    def update_song_list_selection(self, track_id):
         try:
-            self.player.setSource(QUrl.fromLocalFile(song_path))
-            if self.player.isAvailable():
-                if self.player.mediaStatus() in [QMediaPlayer.MediaStatus.NoMedia, QMediaPlayer.MediaStatus.InvalidMedia]:
-                    print(f"Error: Invalid or no media for {song_path}")
-                    return
-                self.playlist_widget.set_current_index(idx)
-                self.player.play()
-                self.play_pause_button.setText("⏸ Pause")
-                self.song_list.setCurrentRow(idx)
-            else:
-                print(f"Error: Media player not available for {song_path}")
-        except Exception as e:
-            print(f"Error in _set_and_play: {e}")
-
-    def update_song_list_selection(self, index):
-        try:
-            self.update_song_list()
-            if 0 <= index < self.song_list.count():
-                self.song_list.setCurrentRow(index)
-        except Exception as e:
-            print(f"Error in update_song_list_selection: {e}")
+            for row in range(self.song_list.count()):
+                if self.song_list.item(row).data(Qt.UserRole) == track_id:
+                    self.song_list.setCurrentRow(row)
+                    break
+        except Exception:
+            playlist_log.exception("Error in update_song_list_selection")
 
     def toggle_play_pause(self):
         try:
             self.playlist_widget.toggle_play_pause()
             self.play_pause_button.setText("▶ Play" if not self.playlist_widget.is_playing else "⏸ Pause")
-        except Exception as e:
-            print(f"Error in toggle_play_pause: {e}")
+        except Exception:
+            playlist_log.exception("Error in toggle_play_pause")
 
     def add_to_play_next(self):
         try:
             selected_items = self.song_list.selectedItems()
             if selected_items:
-                idx = selected_items[0].data(Qt.UserRole)
-                if idx is None or idx < 0 or idx >= len(self.playlist):
-                    print(f"Invalid playlist index for play next: {idx}")
+                track_id = selected_items[0].data(Qt.UserRole)
+                if track_id is None or track_id < 0 or track_id >= len(self.session):
+                    playlist_log.warning("Invalid playlist index for play next: %s", track_id)
                     return
-                song_name, path = self.playlist[idx]
-                self.playlist_widget.add_to_play_next((song_name, path))
-                self.update_song_list()
-        except Exception as e:
-            print(f"Error in add_to_play_next: {e}")
+                self.session.enqueue(track_id)
+        except Exception:
+            playlist_log.exception("Error in add_to_play_next")
+
+    def cycle_shuffle_mode(self):
+        try:
+            mode = self.session.cycle_shuffle_mode()
+            self.shuffle_button.setText(PlaybackSession.SHUFFLE_LABELS[mode])
+            playlist_log.info("Shuffle mode set to %s", mode)
+        except Exception:
+            playlist_log.exception("Error in cycle_shuffle_mode")
+
+# FileWarmTask Class
+class FileWarmTask(QRunnable):
+    """Pull the start of a file into the OS page cache on a QThreadPool worker."""
+    chunk_size = 1 << 20
+
+    def __init__(self, path, max_bytes):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def run(self):
+        try:
+            with open(self.path, "rb") as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, self.max_bytes, os.POSIX_FADV_WILLNEED)
+                    return
+                remaining = self.max_bytes
+                while remaining > 0 and f.read(min(self.chunk_size, remaining)):
+                    remaining -= self.chunk_size
+        except OSError as e:
+            media_log.debug("Could not warm %s: %s", self.path, e)
+
+# PrefetchScheduler Class
+class PrefetchScheduler(QObject):
+    """Warm the likely next song, letter photos and lazily built tab views while the app is idle."""
+    idle_delay = 500
+    audio_lookahead = 2
+    audio_bytes_per_track = 64 << 20
+    image_budget_bytes = 32 << 20
+    image_size = QSize(250, 250)
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.session = window.session
+        self.warmed_audio = OrderedDict()
+        self.warmed_images = set()
+        self.pending_images = []
+        self.image_bytes = 0
+        self.warmed_tabs = set()
+        self.hits = Counter()
+        self.misses = Counter()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.idle_delay)
+        self.timer.timeout.connect(self.run)
+
+        self.panel = detail_panel_for(window)
+        self.panel.image_requested.connect(self.note_image)
+        self.session.current_changed.connect(self.note_track)
+        self.session.current_changed.connect(self.schedule)
+        self.session.queue_changed.connect(self.schedule)
+        self.session.order_changed.connect(self.schedule)
+        window.tabs.currentChanged.connect(self.note_tab)
+
+    def schedule(self, *args):
+        # Restarting the timer keeps prefetch work out of bursts of user activity
+        self.timer.start()
+
+    def run(self):
+        self.warm_audio()
+        self.warm_images()
+        if self.warm_next_tab():
+            self.schedule()
+
+    def warm_audio(self):
+        for track_id in self.session.upcoming(self.audio_lookahead):
+            path = self.session.paths[track_id]
+            if path in self.warmed_audio:
+                continue
+            self.warmed_audio[path] = True
+            if len(self.warmed_audio) > 4 * self.audio_lookahead:
+                self.warmed_audio.popitem(last=False)
+            QThreadPool.globalInstance().start(FileWarmTask(path, self.audio_bytes_per_track))
+
+    def likely_letters(self):
+        letters = self.window.friends_messages_tab.friends_data
+        if history is None:
+            return letters
+        return sorted(letters, key=lambda f: history.count("dialog", f"Message from {f['name']}"), reverse=True)
+
+    def warm_images(self):
+        # Decoded pixmaps stay in the panel's cache, so stop once the memory budget is spent
+        for friend in self.likely_letters():
+            for path in friend["images"]:
+                if self.image_bytes >= self.image_budget_bytes:
+                    return
+                if path in self.warmed_images or path in self.panel.pixmap_cache:
+                    continue
+                self.warmed_images.add(path)
+                task = ImageDecodeTask(len(self.pending_images), path, self.image_size)
+                task.signals.decoded.connect(self.store_image)
+                task.signals.failed.connect(self.drop_image)
+                self.pending_images.append((path, task))
+                self.image_bytes += self.image_size.width() * self.image_size.height() * 4
+                QThreadPool.globalInstance().start(task)
+
+    def store_image(self, slot, image):
+        path, _ = self.pending_images[slot]
+        self.pending_images[slot] = (path, None)
+        if path not in self.panel.pixmap_cache:
+            self.panel.pixmap_cache[path] = QPixmap.fromImage(image)
+
+    def drop_image(self, slot, message):
+        self.pending_images[slot] = (self.pending_images[slot][0], None)
+        self.image_bytes -= self.image_size.width() * self.image_size.height() * 4
+
+    def warm_next_tab(self):
+        """Build one tab's lazy views per idle turn, most visited tabs first."""
+        tabs = [self.window.tabs.widget(i) for i in range(self.window.tabs.count())]
+        if history is not None:
+            tabs.sort(key=lambda tab: history.count("tab", self.window.tabs.tabText(self.window.tabs.indexOf(tab))), reverse=True)
+        for tab in tabs:
+            if hasattr(tab, "prewarm") and tab not in self.warmed_tabs:
+                self.warmed_tabs.add(tab)
+                tab.prewarm()
+                return True
+        return False
+
+    def note_track(self, track_id):
+        self.count_access("audio", self.session.paths[track_id] in self.warmed_audio)
+
+    def note_image(self, path, cached):
+        self.count_access("image", cached)
+
+    def note_tab(self, index):
+        tab = self.window.tabs.widget(index)
+        if hasattr(tab, "prewarm"):
+            self.count_access("tab", tab in self.warmed_tabs)
+
+    def count_access(self, kind, hit):
+        if hit:
+            self.hits[kind] += 1
+        else:
+            self.misses[kind] += 1
+
+    def hit_rate(self, kind):
+        total = self.hits[kind] + self.misses[kind]
+        return self.hits[kind] / total if total else 0.0
+
+    def stats(self):
+        """Hits, misses and hit rate per asset kind, for diagnostics."""
+        return {kind: (self.hits[kind], self.misses[kind], self.hit_rate(kind)) for kind in ("audio", "image", "tab")}
 
 class LoveBoxApp(QMainWindow):
-    def __init__(self, player, audio_output):
+    build_progress = Signal(int, int, str)
+    build_finished = Signal()
+
+    def __init__(self, player, audio_output, session=None, staged=False):
         super().__init__()
         self.player = player
         self.audio_output = audio_output
+        self.session = session
         self.setWindowTitle("LoveBox — For Her 💖")
         self.setGeometry(100, 100, 800, 580)
 
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
-        music_dir = os.path.join(self.script_dir, "M")
-        wav_files = glob.glob(os.path.join(music_dir, "*.wav"))
-        self.playlist = []
-        lauv_file = "Lauv - I Like Me Better [Official Video] 4.wav"
-        lauv_path = os.path.join(music_dir, lauv_file)
-        if os.path.exists(lauv_path):
-            self.playlist.append(("Lauv - I Like Me Better", lauv_path))
-        for file_path in sorted(wav_files):
-            if os.path.basename(file_path) != lauv_file:
-                song_name = clean_song_name(os.path.basename(file_path))
-                print(f"Adding to playlist: {song_name} ({file_path})")
-                self.playlist.append((song_name, file_path))
-
-        icon_path = os.path.join(self.script_dir, "sunflower_icon.png")
-        if os.path.exists(icon_path):
-            print(f"Icon found at: {icon_path}")
-            self.setWindowIcon(QIcon(icon_path))
+
+        # Building is split into steps so it can run in idle slices behind the password dialog
+        self.build_steps = [
+            ("playlist", self.load_session),
+            ("icon", self.init_icon),
+            ("frame", self.init_frame),
+            ("emoji", lambda: emoji_atlas.warm(self.devicePixelRatioF())),
+            ("home_tab", lambda: self.add_tab("home_tab", HomeTab(), "Home")),
+            ("poem_tab", lambda: self.add_tab("poem_tab", PoemTab(), "Poems")),
+            ("friends_messages_tab", lambda: self.add_tab("friends_messages_tab", FriendsMessagesTab(), "Letters")),
+            ("memories_tab", lambda: self.add_tab("memories_tab", MemoriesTab(), "Memories")),
+            ("games_tab", lambda: self.add_tab("games_tab", GamesTab(), "Games")),
+            ("cake_tab", lambda: self.add_tab("cake_tab", CakeTab(), "Birthday Cake")),
+            ("playlist_tab", lambda: self.add_tab("playlist_tab", PlaylistTab(self.player, self.session, self.playlist_widget), "Playlist")),
+            ("qualities_tab", lambda: self.add_tab("qualities_tab", QualitiesTab(), "Qualities")),
+            ("dock", self.init_dock),
+            ("prefetch", self.init_prefetch),
+            ("polish", self.polish_widgets),
+            ("fonts", lambda: fonts.warm([self] + self.findChildren(QWidget))),
+        ]
+        if profiler is not None:
+            self.build_steps.append(("frame_hud", self.init_frame_hud))
+        if staged:
+            self.build_steps.append(("render", self.render_offscreen))
+        self.build_total = len(self.build_steps)
+        self.build_times = []
+        self.build_started = time.perf_counter()
+        self.build_timer = QTimer(self)
+        self.build_timer.setInterval(0)
+        self.build_timer.timeout.connect(self.run_build_step)
+
+        if not staged:
+            self.finish_build()
+
+    def load_session(self):
+        if self.session is None:
+            self.session = PlaybackSession(scan_music(os.path.join(self.script_dir, "M")), self)
+
+    def init_icon(self):
+        if assets.exists("sunflower_icon.png"):
+            self.setWindowIcon(assets.icon("sunflower_icon.png"))
         else:
-            print(f"Icon not found at: {icon_path}")
+            log.info("Icon sunflower_icon.png not found, using a placeholder")
             pixmap = QPixmap(32, 32)
             pixmap.fill(QColor("#0d0d0d"))
             painter = QPainter(pixmap)
@@ -2054,8 +4325,8 @@ class LoveBoxApp(QMainWindow):
             painter.drawLine(8, 8, 24, 24)
             painter.end()
             self.setWindowIcon(QIcon(pixmap))
-            print("Using fallback placeholder icon")
 
+    def init_frame(self):
         self.heart_animation = HeartAnimationWidget(self)
         self.heart_animation.setGeometry(0, 0, 800, 580)
         self.heart_animation.lower()
@@ -2067,50 +4338,18 @@ class LoveBoxApp(QMainWindow):
         main_layout.setSpacing(0)
 
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet("""
-            QTabWidget::pane { 
-                border: 2px solid #4682b4; 
-                border-radius: 10px; 
-                background-color: #0d0d0d; 
-            }
-            QTabBar::tab { 
-                background: #0d0d0d; 
-                color: #4fc3f7; 
-                padding: 10px; 
-                margin-right: 2px; 
-                border-top-left-radius: 5px; 
-                border-top-right-radius: 5px; 
-                font-size: 14px; 
-            }
-            QTabBar::tab:selected { 
-                background: #4682b4; 
-                color: #0d0d0d; 
-            }
-        """)
-        font = QFont("Georgia", 14)
-        font.setItalic(True)
+        self.tabs.setObjectName("mainTabs")
+        font = ui_font(14, italic=True)
         self.tabs.setFont(font)
-
-        self.playlist_widget = PlaylistWidget(self.player, self.playlist)
-        self.home_tab = HomeTab()
-        self.poem_tab = PoemTab()
-        self.friends_messages_tab = FriendsMessagesTab()
-        self.memories_tab = MemoriesTab()
-        self.games_tab = GamesTab()
-        self.cake_tab = CakeTab()
-        self.playlist_tab = PlaylistTab(self.player, self.playlist, self.playlist_widget)
-        self.qualities_tab = QualitiesTab()
-
-        self.tabs.addTab(self.home_tab, "Home")
-        self.tabs.addTab(self.poem_tab, "Poems")
-        self.tabs.addTab(self.friends_messages_tab, "Letters")
-        self.tabs.addTab(self.memories_tab, "Memories")
-        self.tabs.addTab(self.games_tab, "Games")
-        self.tabs.addTab(self.cake_tab, "Birthday Cake")
-        self.tabs.addTab(self.playlist_tab, "Playlist")
-        self.tabs.addTab(self.qualities_tab, "Qualities")
         main_layout.addWidget(self.tabs)
 
+        self.playlist_widget = PlaylistWidget(self.player, self.session)
+
+    def add_tab(self, name, tab, title):
+        setattr(self, name, tab)
+        self.tabs.addTab(tab, title)
+
+    def init_dock(self):
         self.playlist_dock = QDockWidget()
         self.playlist_dock.setFeatures(QDockWidget.NoDockWidgetFeatures)
         self.playlist_dock.setTitleBarWidget(QWidget())
@@ -2119,23 +4358,191 @@ class LoveBoxApp(QMainWindow):
 
         self.player.errorOccurred.connect(self.handle_media_error)
         self.player.mediaStatusChanged.connect(self.handle_media_status)
+        self.tabs.currentChanged.connect(self.record_tab_view)
+
+    def init_prefetch(self):
+        self.prefetcher = PrefetchScheduler(self)
+        self.prefetcher.schedule()
+
+    def init_frame_hud(self):
+        self.frame_hud = FrameHud(profiler, self)
+        QShortcut(QKeySequence("F12"), self, self.frame_hud.toggle)
+        csv_path = os.path.join(self.script_dir, ".lovebox_cache", "frames.csv")
+        QShortcut(QKeySequence("Ctrl+F12"), self, lambda: profiler.export_csv(csv_path))
+
+    def record_tab_view(self, index):
+        record_event("tab", self.tabs.tabText(index))
+
+    def polish_widgets(self):
+        # Resolve stylesheets and layouts now rather than on the first show
+        for widget in [self] + self.findChildren(QWidget):
+            widget.ensurePolished()
+        self.centralWidget().layout().activate()
+
+    def render_offscreen(self):
+        # Paint one hidden frame so glows and glyphs are cached before the first show
+        self.grab()
+
+    def start_staged_build(self):
+        """Build the window one step per idle event loop turn."""
+        self.build_started = time.perf_counter()
+        self.build_timer.start()
+
+    def run_build_step(self):
+        if not self.build_steps:
+            self.build_timer.stop()
+            return
+        name, step = self.build_steps.pop(0)
+        started = time.perf_counter()
+        step()
+        self.build_times.append((name, (time.perf_counter() - started) * 1000))
+        done = self.build_total - len(self.build_steps)
+        self.build_progress.emit(done, self.build_total, name)
+        if not self.build_steps:
+            self.build_timer.stop()
+            slowest = max(self.build_times, key=lambda item: item[1])
+            # Wall time includes the idle turns between staged steps
+            log.info("LoveBox built in %.0f ms, %.0f ms of it in build steps (slowest step: %s, %.0f ms)",
+                     (time.perf_counter() - self.build_started) * 1000,
+                     sum(ms for _, ms in self.build_times), slowest[0], slowest[1])
+            self.build_finished.emit()
+
+    def finish_build(self):
+        """Run whatever steps are still pending, e.g. when unlocking before pre-warm is done."""
+        while self.build_steps:
+            self.run_build_step()
+
+    def is_built(self):
+        return not self.build_steps
 
     def resizeEvent(self, event):
         self.heart_animation.setGeometry(0, 0, self.width(), self.height())
         super().resizeEvent(event)
 
     def handle_media_error(self, error):
-        print(f"Media Player Error: {self.player.errorString()} (Error code: {error})")
+        media_log.error("Media player error: %s (error code: %s)", self.player.errorString(), error)
 
     def handle_media_status(self, status):
-        print(f"Media status changed: {status}")
+        media_log.debug("Media status changed: %s", status)
 
     def closeEvent(self, event):
-        print("Application closing, stopping audio")
+        log.info("Application closing, stopping audio")
         self.player.stop()
         super().closeEvent(event)
 
+# Export
+# `python V8.py --export cake --out cake.mp4` renders an animation headless at a fixed
+# timestep. The frame range is split over a process pool; every worker replays the
+# animation on a SimulatedClock from the start, which is cheap, so its frames match a
+# single continuous run, and only paints its own share.
+EXPORT_ANIMATIONS = {
+    "cake": lambda: CakeWidget("chocolate"),
+    "sunflower": SunflowerWidget,
+    "hearts": HeartAnimationWidget,
+}
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".webm", ".gif")
+
+def render_frames(name, first, last, fps, width, height, seed, frame_dir):
+    """Render frames first..last-1 of an animation as PNGs in frame_dir; runs in a pool worker."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication([])
+    apply_theme(app)
+    fonts.load_directory(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"))
+    random.seed(seed)
+    simulated = set_clock(SimulatedClock())
+
+    widget = EXPORT_ANIMATIONS[name]()
+    if widget.minimumSize() == widget.maximumSize():
+        # Fixed-size widgets are painted at a higher pixel ratio and letterboxed
+        scale = min(width / widget.width(), height / widget.height())
+    else:
+        widget.resize(width, height)
+        scale = 1.0
+    widget.setAttribute(Qt.WA_DontShowOnScreen)
+    widget.show()
+
+    source = QImage(round(widget.width() * scale), round(widget.height() * scale), QImage.Format_ARGB32_Premultiplied)
+    source.setDevicePixelRatio(scale)
+    target = QRectF((width - source.width()) / 2, (height - source.height()) / 2, source.width(), source.height())
+    frame_image = QImage(width, height, QImage.Format_RGB32)
+    background = QColor(THEME_COLORS["background"])
+
+    paths = []
+    for frame in range(last):
+        simulated.advance(frame * 1000 / fps - simulated.now())
+        if frame < first:
+            continue
+        source.fill(Qt.transparent)
+        # Skip the top-level window background so the themed one shows through
+        widget.render(source, QPoint(), QRegion(), QWidget.DrawChildren)
+        frame_image.fill(background)
+        painter = QPainter(frame_image)
+        painter.drawImage(target, source)
+        painter.end()
+        path = os.path.join(frame_dir, f"frame_{frame:05d}.png")
+        frame_image.save(path)
+        paths.append(path)
+    return paths
+
+def export_animation(name, out, seconds=10.0, fps=30, width=1920, height=1080, workers=None, seed=0):
+    """Render an animation to a PNG sequence directory, or to a video file through ffmpeg."""
+    frames = max(1, round(seconds * fps))
+    video = os.path.splitext(out)[1].lower() in VIDEO_EXTENSIONS
+    ffmpeg = shutil.which("ffmpeg")
+    if video and ffmpeg is None:
+        log.error("ffmpeg is needed to write %s; export to a directory for a PNG sequence instead", out)
+        return 1
+    frame_dir = tempfile.mkdtemp(prefix=f"lovebox-{name}-") if video else out
+    os.makedirs(frame_dir, exist_ok=True)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, frames))
+    chunk = -(-frames // workers)
+    started = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(render_frames, name, first, min(first + chunk, frames), fps, width, height, seed, frame_dir)
+                   for first in range(0, frames, chunk)]
+        for future in futures:
+            future.result()
+    log.info("Rendered %d %s frames at %dx%d with %d workers in %.1f s", frames, name, width, height, workers, time.perf_counter() - started)
+    if not video:
+        return 0
+
+    command = [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps), "-i", os.path.join(frame_dir, "frame_%05d.png")]
+    if not out.lower().endswith(".gif"):
+        command += ["-pix_fmt", "yuv420p"]
+    try:
+        subprocess.run(command + [out], check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        log.error("ffmpeg failed, frames left in %s: %s", frame_dir, e)
+        return 1
+    shutil.rmtree(frame_dir, ignore_errors=True)
+    log.info("Wrote %s", out)
+    return 0
+
+def export_main(argv):
+    parser = argparse.ArgumentParser(prog="V8.py --export", description="Render a LoveBox animation headless.")
+    parser.add_argument("--export", required=True, choices=sorted(EXPORT_ANIMATIONS))
+    parser.add_argument("--out", help="directory for a PNG sequence, or a video file (.mp4, .webm, .gif, ...)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--size", default="1920x1080", help="WIDTHxHEIGHT")
+    parser.add_argument("--workers", type=int, help="processes to render with (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, for repeatable heart animations")
+    args = parser.parse_args(argv)
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    out = args.out or f"{args.export}_frames"
+    return export_animation(args.export, out, args.seconds, args.fps, width, height, args.workers, args.seed)
+
 if __name__ == "__main__":
+    if "--export" in sys.argv:
+        logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+        sys.exit(export_main(sys.argv[1:]))
+    if "--pack-assets" in sys.argv:
+        logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+        pack_path = os.path.join(assets.root, ASSET_PACK_NAME)
+        store_log.info("Packed %d assets into %s", build_asset_pack(assets.root, pack_path), pack_path)
+        sys.exit(0)
+
     app = QApplication(sys.argv)
 
     palette = QPalette()
@@ -2145,30 +4552,49 @@ if __name__ == "__main__":
     palette.setColor(QPalette.ColorRole.AlternateBase, QColor("#0d0d0d"))
     palette.setColor(QPalette.ColorRole.Text, QColor("#4fc3f7"))
     app.setPalette(palette)
+    apply_theme(app)
+    fonts.load_directory(os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"))
+    start_watchdog()
+    if os.environ.get("LOVEBOX_PROFILE"):
+        start_profiler()
 
     player = QMediaPlayer()
     audio_output = QAudioOutput()
     player.setAudioOutput(audio_output)
-    audio_output.setVolume(0.5)
+    audio_output.setVolume(PLAYBACK_VOLUME)
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    music_dir = os.path.join(script_dir, "M")
-    wav_files = glob.glob(os.path.join(music_dir, "*.wav"))
-    playlist = []
-    lauv_file = "Lauv - I Like Me Better [Official Video] 4.wav"
-    lauv_path = os.path.join(music_dir, lauv_file)
-    if os.path.exists(lauv_path):
-        playlist.append(("Lauv - I Like Me Better", lauv_path))
-    for file_path in sorted(wav_files):
-        if os.path.basename(file_path) != lauv_file:
-            song_name = clean_song_name(os.path.basename(file_path))
-            playlist.append((song_name, file_path))
-
-    pwd_dialog = PasswordDialog(player, audio_output, playlist)
+    setup_logging(os.path.join(script_dir, ".lovebox_cache", "lovebox.log"))
+    open_history(os.path.join(script_dir, ".lovebox_cache", "history.sqlite3"))
+    open_library(os.path.join(script_dir, ".lovebox_cache", "library_index.json"))
+    open_assets(os.path.join(script_dir, ASSET_PACK_NAME))
+    session = PlaybackSession(scan_music(os.path.join(script_dir, "M")))
+    loudness_scanner = LoudnessScanner([session.paths[track_id] for track_id in session.order])
+
+    # Build the main window hidden while the password dialog waits for input
+    window = LoveBoxApp(player, audio_output, session, staged=True)
+    window.start_staged_build()
+
+    pwd_dialog = PasswordDialog(player, audio_output, session)
     if pwd_dialog.exec() == QDialog.DialogCode.Accepted:
-        window = LoveBoxApp(player, audio_output)
+        window.finish_build()
         window.show()
-        sys.exit(app.exec())
+        # Every scan worker re-imports PySide6 and numpy, so keep the spawns clear of the
+        # password dialog and the window's first frames
+        QTimer.singleShot(LoudnessScanner.start_delay, loudness_scanner.start)
+        exit_code = app.exec()
+        loudness_scanner.stop()
+        library.flush()
+        watchdog.stop()
+        if watchdog.stall_count:
+            diagnostics_log.warning("%s", watchdog.report())
+        history.close()
+        stop_logging()
+        sys.exit(exit_code)
     else:
         player.stop()
+        loudness_scanner.stop()
+        library.flush()
+        history.close()
+        stop_logging()
         sys.exit(0)
@@ -0,0 +1,63 @@
+"""Time how long Qt spends polishing the styles of the whole LoveBox window.
+
+Works against older revisions too (the theme is only applied when V8 has one),
+so the same script gives the before/after numbers. Run headless with:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_style_polish.py
+"""
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+import V8
+
+
+def repolish(window):
+    widgets = [window] + window.findChildren(QWidget)
+    for widget in widgets:
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+    return len(widgets)
+
+
+def run(repeats=5):
+    app = QApplication.instance() or QApplication(sys.argv)
+    if hasattr(V8, "apply_theme"):
+        V8.apply_theme(app)
+    player = QMediaPlayer()
+    audio_output = QAudioOutput()
+    player.setAudioOutput(audio_output)
+
+    start = time.perf_counter()
+    window = V8.LoveBoxApp(player, audio_output)
+    construct_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    window.show()
+    app.processEvents()
+    first_show_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        widget_count = repolish(window)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    window.close()
+    return {
+        "widgets": widget_count,
+        "construct_ms": round(construct_ms, 2),
+        "first_show_ms": round(first_show_ms, 2),
+        "repolish_ms": round(min(timings), 2),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,224 @@
+"""Time the UI code paths LoveBox actually hits, headless, and compare against a baseline.
+
+Covers tab construction, PlaylistTab.update_song_list at growing library sizes,
+GamesTab.update_maze per key press, HeartAnimationWidget update/paint at growing
+particle counts and clean_song_name throughput. Run with:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_ui.py
+Results are written to benchmarks/results.json. Each run prints the ratio of the best
+(min_ms) timings to benchmarks/baseline.json and exits with status 1 when anything got
+slower than --threshold; the default of 2.0 sits above the 1.3-2x run-to-run noise seen
+on a shared machine. The committed baseline is a full run of a known good revision on the
+machine described in its "meta"; timings only compare on similar hardware, so pass
+--save-baseline once on yours before using the comparison to catch regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6 import __version__ as pyside_version
+from PySide6.QtCore import Qt, QEvent
+from PySide6.QtGui import QColor, QImage, QKeyEvent
+from PySide6.QtWidgets import QApplication
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+import V8
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SONG_NAMES = [
+    "Lauv - I Like Me Better [Official Video] 4.wav",
+    "Tum Hi Ho (Official Audio) - Arijit Singh.wav",
+    "Baarish ｜ Half Girlfriend ｜ Lyrical.wav",
+    "Perfect - Ed Sheeran [Lyrics].wav",
+    "Song Once upon A Time.wav",
+    "Raabta.wav",
+]
+
+
+def measure(fn, repeats=5, number=1):
+    """Milliseconds per call of fn: the median and the best of `repeats` runs of `number` calls."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) * 1000 / number)
+    return {"ms": round(statistics.median(timings), 4), "min_ms": round(min(timings), 4)}
+
+
+def drain(app):
+    # Let deleteLater and queued signals run between cases so they don't leak into timings
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def bench_tabs(app, player):
+    results = {}
+    session = V8.PlaybackSession(V8.scan_music(os.path.join(os.path.dirname(BENCH_DIR), "M")))
+    playlist_widget = V8.PlaylistWidget(player, session)
+    factories = {
+        "HomeTab": V8.HomeTab,
+        "PoemTab": V8.PoemTab,
+        "FriendsMessagesTab": V8.FriendsMessagesTab,
+        "MemoriesTab": V8.MemoriesTab,
+        "GamesTab": V8.GamesTab,
+        "CakeTab": V8.CakeTab,
+        "QualitiesTab": V8.QualitiesTab,
+        "PlaylistTab": lambda: V8.PlaylistTab(player, session, playlist_widget),
+    }
+    for name, factory in factories.items():
+        results[f"tab/{name}"] = measure(lambda: factory().deleteLater())
+        drain(app)
+    playlist_widget.deleteLater()
+    drain(app)
+    return results
+
+
+def bench_song_list(app, player, sizes):
+    results = {}
+    # Every row points at a file that exists, so update_song_list takes its normal path
+    existing = os.path.abspath(V8.__file__)
+    for size in sizes:
+        session = V8.PlaybackSession([(f"Song {i}", existing) for i in range(size)])
+        playlist_widget = V8.PlaylistWidget(player, session)
+        tab = V8.PlaylistTab(player, session, playlist_widget)
+        repeats = 5 if size <= 10_000 else 1
+        results[f"update_song_list/{size}"] = measure(tab.update_song_list, repeats=repeats)
+        tab.deleteLater()
+        playlist_widget.deleteLater()
+        drain(app)
+    return results
+
+
+def bench_maze(app):
+    tab = V8.GamesTab()
+    tab.show()
+    app.processEvents()
+    moves = [QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier) for key in (Qt.Key_Right, Qt.Key_Left)]
+    step = iter(range(sys.maxsize))
+
+    def press():
+        # Right then left from the start cell, so the heart never reaches the goal
+        tab.keyPressEvent(moves[next(step) % 2])
+
+    result = {"update_maze/keypress": measure(press, number=50)}
+    tab.deleteLater()
+    drain(app)
+    return result
+
+
+def bench_hearts(app, counts):
+    results = {}
+    widget = V8.HeartAnimationWidget()
+    widget.heart_timer.stop()
+    widget.resize(800, 580)
+    image = QImage(widget.size(), QImage.Format_ARGB32_Premultiplied)
+    rng = random.Random(1)
+
+    def paint():
+        image.fill(Qt.transparent)
+        widget.render(image)
+
+    for count in counts:
+        # Slow hearts spread over the height, so the population stays put while timing
+        widget.hearts = [{
+            "x": rng.randint(50, 750),
+            "y": rng.uniform(100, 580),
+            "alpha": 255,
+            "speed": 0.001,
+            "color": QColor(255, 99, 71, 255),
+        } for _ in range(count)]
+        results[f"hearts/update/{count}"] = measure(widget.update_hearts, number=10)
+        results[f"hearts/paint/{count}"] = measure(paint, number=3)
+    widget.deleteLater()
+    drain(app)
+    return results
+
+
+def bench_clean_song_name(count=10_000):
+    names = (SONG_NAMES * (count // len(SONG_NAMES) + 1))[:count]
+
+    def clean_all():
+        for name in names:
+            V8.clean_song_name(name)
+
+    result = measure(clean_all)
+    result["names_per_s"] = round(count / (result["ms"] / 1000))
+    return {f"clean_song_name/{count}": result}
+
+
+def compare(results, baseline, threshold):
+    """Print each result's best time next to its baseline; return the names that got slower than threshold."""
+    # Best-of-N is the least noisy figure: interference only ever makes a run slower
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:32} {result['min_ms']:10.3f} ms")
+            continue
+        ratio = result["min_ms"] / base["min_ms"] if base["min_ms"] else 1.0
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:32} {result['min_ms']:10.3f} ms  baseline {base['min_ms']:10.3f} ms  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=2.0, help="slowdown ratio of best times reported as a regression")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k track and 10k heart cases")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    V8.apply_theme(app)
+    player = QMediaPlayer()
+    audio_output = QAudioOutput()
+    player.setAudioOutput(audio_output)
+
+    results = {}
+    results.update(bench_tabs(app, player))
+    results.update(bench_song_list(app, player, [100, 10_000] if args.quick else [100, 10_000, 100_000]))
+    results.update(bench_maze(app))
+    results.update(bench_hearts(app, [10, 100, 1000] if args.quick else [10, 100, 1000, 10_000]))
+    results.update(bench_clean_song_name())
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pyside": pyside_version,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    report["regressions"] = regressions
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    sys.exit(1 if regressions and not args.save_baseline else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Run LoveBox's timer-driven animations on a SimulatedClock and check where they end up.
+
+Covers the cake drawing and its wish countdown, the sunflower (including a hide in the
+middle of drawing) and the floating hearts with a fixed random seed. Every case replays
+many seconds of animation without waiting; the script prints how long each took and
+exits with status 1 if a check fails or a case takes longer than --max-ms. Run with:
+    QT_QPA_PLATFORM=offscreen python benchmarks/sim_animations.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication
+
+import V8
+
+
+def check(failures, name, condition, message):
+    if not condition:
+        failures.append(f"{name}: {message}")
+
+
+def case_cake(failures):
+    clock = V8.set_clock(V8.SimulatedClock())
+    cake = V8.CakeWidget("chocolate")
+    cake.show()
+
+    # 5 drawing stages of 20 ticks at 50 ms, then the countdown starts on the next tick
+    clock.advance(4990)
+    check(failures, "cake", cake.draw_stage == 4 and not cake.countdown_active, f"still drawing at 4.99 s, got stage {cake.draw_stage}")
+    clock.advance(100)
+    check(failures, "cake", cake.countdown_active and cake.countdown_label.text() == "Make a Wish! (5)", "countdown did not start at 5.05 s")
+    clock.advance(3000)
+    check(failures, "cake", cake.countdown_label.text() == "Make a Wish! (2)", f"countdown at 8.09 s reads {cake.countdown_label.text()!r}")
+    clock.advance(2000)
+    check(failures, "cake", not cake.show_flames and cake.countdown_label.text() == "Wish Made! 💖", "wish not made at 10.09 s")
+    check(failures, "cake", cake.countdown_label.isVisible(), "wish label hidden too early")
+    clock.advance(2000)
+    check(failures, "cake", not cake.countdown_label.isVisible(), "wish label still shown at 12.09 s")
+
+    # Picking another flavour mid-countdown must cancel the old countdown and pending hide
+    cake.configure("vanilla")
+    clock.advance(5090)
+    cake.configure("strawberry")
+    clock.advance(3000)
+    check(failures, "cake", not cake.countdown_active and cake.show_flames and cake.draw_stage == 3, "reconfigure did not restart the animation")
+    cake.deleteLater()
+
+
+def case_sunflower(failures):
+    clock = V8.set_clock(V8.SimulatedClock())
+    flower = V8.SunflowerWidget()
+    flower.resize(400, 400)
+    flower.show()
+
+    clock.advance(1000)
+    progress = (flower.draw_stage, flower.progress)
+    flower.hide()
+    clock.advance(5000)
+    check(failures, "sunflower", (flower.draw_stage, flower.progress) == progress, "kept drawing while hidden")
+    flower.show()
+    # 3 stages of 50 ticks at 50 ms, 1 s of which ran before the hide; the next tick stops the timer
+    clock.advance(6600)
+    check(failures, "sunflower", flower.draw_stage == 3 and not flower.draw_timer.isActive(), f"not finished after 7.6 s shown, stage {flower.draw_stage}")
+    flower.deleteLater()
+
+
+def run_hearts(seed, ms):
+    clock = V8.set_clock(V8.SimulatedClock())
+    random.seed(seed)
+    hearts = V8.HeartAnimationWidget()
+    hearts.resize(800, 580)
+    clock.advance(ms)
+    state = [(heart["x"], round(heart["y"], 6), round(heart["speed"], 6)) for heart in hearts.hearts]
+    hearts.deleteLater()
+    return state
+
+
+def case_hearts(failures):
+    first = run_hearts(7, 60_000)
+    check(failures, "hearts", len(first) > 0, "no hearts after a minute")
+    check(failures, "hearts", run_hearts(7, 60_000) == first, "same seed gave different hearts")
+    check(failures, "hearts", run_hearts(8, 60_000) != first, "different seeds gave the same hearts")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-ms", type=float, default=1000, help="wall time allowed per case")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    V8.apply_theme(app)
+
+    failures = []
+    for name, case in (("cake", case_cake), ("sunflower", case_sunflower), ("hearts", case_hearts)):
+        started = time.perf_counter()
+        case(failures)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{name:10} {elapsed:8.1f} ms")
+        check(failures, name, elapsed <= args.max_ms, f"took {elapsed:.0f} ms")
+    V8.set_clock(V8.QtClock())
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Open every LoveBox dialog over and over and check that QObjects and pixmaps stay bounded.
+
+Each flow is warmed up, then run --count times (1000 by default) between two
+censuses from V8.take_census. Exits with status 1 if any flow grew by more than
+--max-objects QObjects or --max-pixmap-kib of pixmap data. Run headless with:
+    QT_QPA_PLATFORM=offscreen python benchmarks/soak_dialogs.py
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QEvent, QTimer, QThreadPool
+from PySide6.QtWidgets import QApplication
+from PySide6.QtMultimedia import QMediaPlayer, QAudioOutput
+
+import V8
+
+
+def accept_modal():
+    dialog = QApplication.activeModalWidget()
+    if dialog is not None:
+        dialog.accept()
+
+
+def run_modal(open_dialog):
+    # exec() blocks, so queue the click on the dialog's button before opening it
+    QTimer.singleShot(0, accept_modal)
+    open_dialog()
+
+
+def settle(app):
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+    gc.collect()
+
+
+def quiesce(app, window):
+    """Finish the staged build and run idle prefetching now, so neither lands inside a census."""
+    window.finish_build()
+    prefetcher = window.prefetcher
+    prefetcher.timer.stop()
+    prefetcher.run()
+    while prefetcher.warm_next_tab():
+        pass
+    QThreadPool.globalInstance().waitForDone()
+    settle(app)
+    prefetcher.timer.stop()
+
+
+def flows(window):
+    letters = window.friends_messages_tab
+    qualities = window.qualities_tab
+    panel = V8.detail_panel_for(window)
+    friend = letters.friends_data[0]
+    quality = qualities.qualities[0]
+
+    def open_letter():
+        letters.show_message(friend["name"], friend["message"], friend["images"])
+        panel.hide()
+
+    def open_quality():
+        qualities.show_quality_dialog(quality)
+        panel.hide()
+
+    return {
+        "letter": open_letter,
+        "quality": open_quality,
+        "win_dialog": lambda: run_modal(window.games_tab.show_win_dialog),
+        "gift": lambda: run_modal(window.memories_tab.open_gift),
+    }
+
+
+def soak(app, name, flow, count, warmup=20):
+    for _ in range(warmup):
+        flow()
+        settle(app)
+    before = V8.take_census()
+    start = time.perf_counter()
+    for i in range(count):
+        flow()
+        if i % 50 == 0:
+            settle(app)
+    settle(app)
+    elapsed = time.perf_counter() - start
+    diff = V8.diff_census(before, V8.take_census())
+    print(f"{name}: {count} opens in {elapsed:.1f} s, {V8.format_census_diff(diff)}")
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--max-objects", type=int, default=20)
+    parser.add_argument("--max-pixmap-kib", type=int, default=1024)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    V8.apply_theme(app)
+    player = QMediaPlayer()
+    audio_output = QAudioOutput()
+    player.setAudioOutput(audio_output)
+    window = V8.LoveBoxApp(player, audio_output)
+    window.show()
+    settle(app)
+    quiesce(app, window)
+
+    failures = []
+    for name, flow in flows(window).items():
+        diff = soak(app, name, flow, args.count)
+        if diff["object_total"] > args.max_objects or diff["pixmap_bytes"] > args.max_pixmap_kib * 1024:
+            failures.append(name)
+    if failures:
+        print(f"Unbounded growth in: {', '.join(failures)}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()